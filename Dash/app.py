@@ -1,5 +1,6 @@
+import os
 import streamlit as st
-from utils.page_config import setup_page_config, init_session_state, apply_custom_css
+from utils.page_config import setup_page_config, init_session_state, apply_custom_css, keep_widget_state
 from components.header import render_header
 from components.home import render_home
 from components.project_tab import render_project_tab
@@ -7,6 +8,24 @@ from components.finance_tab import render_finance_tab
 from components.data_tab import render_data_tab
 from components.chat import render_chat_component
 
+# Sections of the dashboard, in navigation order
+SECTIONS = {
+    "Home": render_home,
+    "Project Management": render_project_tab,
+    "Finance & Reports": render_finance_tab,
+    "Data Table": render_data_tab,
+    # Add the chat component directly as a tab
+    "Chat with Data": render_chat_component,
+}
+
+# "lazy" runs only the selected section; "tabs" is the old st.tabs layout, which runs
+# every section on each rerun (kept to compare rerun times, see benchmarks/rerun_timing.py)
+NAVIGATION = os.environ.get("DASH_NAVIGATION", "lazy").lower()
+
+# Widget keys of the section controls, kept while their section is not shown
+SECTION_WIDGET_PREFIXES = ("filter_", "units_range", "profit_range", "start_date", "end_date",
+                           "search_", "table_", "export_format")
+
 def main():
     # Setup page configuration
     setup_page_config()
@@ -16,25 +35,18 @@ def main():
     # Render header
     render_header()
     
-    # Navigation tabs - now including Home as the first tab
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(
-        ["Home", "Project Management", "Finance & Reports", "Data Table", "Chat with Data"])
-    
-    with tab1:
-        render_home()
-        
-    with tab2:
-        render_project_tab()
-    
-    with tab3:
-        render_finance_tab()
-    
-    with tab4:
-        render_data_tab()
-        
-    with tab5:
-        # Add the chat component directly as a tab
-        render_chat_component()
+    if NAVIGATION == "tabs":
+        # Navigation tabs - now including Home as the first tab
+        for tab, render in zip(st.tabs(list(SECTIONS)), SECTIONS.values()):
+            with tab:
+                render()
+    else:
+        # Tab-styled navigation that only executes the selected section
+        keep_widget_state(SECTION_WIDGET_PREFIXES)
+        with st.container(key="section_nav"):
+            section = st.radio("Section", list(SECTIONS), horizontal=True,
+                               label_visibility="collapsed", key="active_section")
+        SECTIONS[section]()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
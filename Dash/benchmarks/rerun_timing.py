@@ -0,0 +1,55 @@
+"""Measure how long a rerun of the dashboard takes with each navigation mode.
+
+"tabs" is the old st.tabs layout, which runs every section on each rerun;
+"lazy" runs only the selected section. The app is driven headless with
+Streamlit's AppTest: one cold run (empty caches), then warm reruns.
+
+Run from the Dash directory:
+    python benchmarks/rerun_timing.py [reruns]
+"""
+import os
+import statistics
+import sys
+import time
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+
+def timed(run):
+    started = time.perf_counter()
+    run()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(navigation, reruns, section=None):
+    os.environ["DASH_NAVIGATION"] = navigation
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+    at = AppTest.from_file(os.path.join(os.getcwd(), "app.py"), default_timeout=300)
+    # The chat section builds its LLM client on render; no request is sent
+    at.secrets["OPENAI_API_KEY"] = os.environ.get("OPENAI_API_KEY", "benchmark")
+    cold = timed(at.run)
+    if section is not None:
+        at.radio(key="active_section").set_value(section)
+        at.run()
+    warm = [timed(at.run) for _ in range(reruns)]
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+    label = navigation if section is None else f"{navigation} ({section})"
+    print(f"{label:<28} cold {cold:8.0f} ms   warm median {statistics.median(warm):6.0f} ms "
+          f"(min {min(warm):.0f}, max {max(warm):.0f})")
+
+
+def main():
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    print(f"{reruns} warm reruns per mode")
+    measure("tabs", reruns)
+    measure("lazy", reruns)
+    measure("lazy", reruns, section="Data Table")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure how much memory each session's copy of the dataset costs.
+
+Compares the old st.cache_data behaviour (every rerun unpickles its own copy
+and render_data_tab copies it again) with the shared st.cache_resource frame
+handed out as copy-on-write views.
+
+Run from the Dash directory:
+    python benchmarks/session_memory.py [data.csv] [sessions]
+"""
+import os
+import pickle
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.schema import detect_schema, csv_read_options, apply_schema  # noqa: E402
+
+
+def load(path):
+    schema = detect_schema(pd.read_csv(path, nrows=0).columns)
+    return apply_schema(pd.read_csv(path, **csv_read_options(schema)), schema)
+
+
+def measure(label, make_copy, df, sessions):
+    tracemalloc.start()
+    copies = [make_copy(df) for _ in range(sessions)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<48} {current / sessions / 1024:12.1f} KiB per session")
+    return copies
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "data.csv"
+    sessions = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    if int(pd.__version__.split(".")[0]) < 3:
+        # Always on from pandas 3, where the option is deprecated
+        pd.set_option("mode.copy_on_write", True)
+    df = load(path)
+    print(f"{path}: {len(df)} rows, {df.memory_usage(deep=True).sum() / 1024:.1f} KiB in memory, "
+          f"{sessions} sessions")
+
+    measure("before: st.cache_data copy + df.copy()",
+            lambda frame: pickle.loads(pickle.dumps(frame)).copy(), df, sessions)
+    measure("after: shared st.cache_resource view",
+            lambda frame: frame.copy(deep=False), df, sessions)
+
+
+if __name__ == "__main__":
+    main()
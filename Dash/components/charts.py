@@ -0,0 +1,135 @@
+import matplotlib.pyplot as plt
+
+# Chart builders for the dashboard pages. Each takes (data, theme, figsize) and
+# returns a new matplotlib figure; they are plain top-level functions so they can
+# be rendered and cached outside the page code (see utils.chart_cache).
+
+
+def _style_axes(ax, colors):
+    """Shared finishing touches: light grid, no top/right spines, soft background"""
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_alpha(0.3)
+    ax.spines['bottom'].set_alpha(0.3)
+    ax.set_facecolor('#F8FAFC')
+    ax.figure.patch.set_facecolor(colors['background'])
+
+
+def revenue_by_company(data, theme, figsize=(10, 4)):
+    """Bar chart of revenue (in millions) per company"""
+    colors = theme['colors']
+    companies, revenue = data['companies'], data['revenue']
+
+    fig, ax = plt.subplots(figsize=figsize)
+
+    # Create a color gradient for bars
+    bar_colors = [colors['primary'], colors['secondary'], colors['accent1'], colors['accent2'], colors['accent3']]
+    bars = ax.bar(companies, revenue, color=bar_colors, edgecolor='white', linewidth=1, width=0.4)
+
+    # Add data labels on top of bars with better formatting
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05, f'₹{height}M',
+                ha='center', va='bottom', fontweight='bold', fontsize=10, color=colors['dark'])
+
+    # Customize the chart for better aesthetics
+    ax.set_ylabel('Revenue (₹ in Millions)', fontsize=11)
+    ax.set_title('Revenue by Company - Current Quarter', fontsize=14, pad=15, fontweight='bold')
+    ax.grid(axis='y', linestyle='--', alpha=0.3, zorder=0)
+    ax.tick_params(axis='both', which='major', labelsize=10)
+    _style_axes(ax, colors)
+
+    # Set y-axis to start from 0
+    ax.set_ylim(0, max(revenue) + 0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+def project_completion(data, theme, figsize=(8, 4.5)):
+    """Line chart of monthly project completion rates per company"""
+    colors = theme['colors']
+    months = data['months']
+    series = [(name, values, color, marker) for (name, values), color, marker in zip(
+        data['companies'].items(), [colors['primary'], colors['accent1'], colors['accent2']], ['o', 's', '^'])]
+
+    fig, ax = plt.subplots(figsize=figsize)
+
+    for name, values, color, marker in series:
+        ax.plot(months, values, marker=marker, linewidth=3, label=name,
+                color=color, markerfacecolor='white', markeredgecolor=color,
+                markeredgewidth=2, markersize=8)
+
+    # Add value annotations for every other point to avoid crowding
+    for i in range(0, len(months), 2):
+        for name, values, color, marker in series:
+            ax.annotate(f"{values[i]}%", (i, values[i]), xytext=(0, 8), textcoords='offset points',
+                        ha='center', fontsize=8, fontweight='bold', color=color)
+
+    # Customize chart for better aesthetics
+    ax.set_ylabel('Completion Rate (%)', fontsize=11)
+    ax.set_ylim(70, 100)
+    ax.grid(True, linestyle='--', alpha=0.3)
+
+    # Improved legend with custom positioning
+    legend = ax.legend(loc='lower right', frameon=True, framealpha=0.9, edgecolor='#E5E7EB')
+    legend.get_frame().set_facecolor(colors['background'])
+
+    ax.set_title('Project Completion Trends', fontsize=14, pad=15, fontweight='bold')
+    _style_axes(ax, colors)
+
+    fig.tight_layout()
+    return fig
+
+
+def resource_allocation(data, theme, figsize=(8, 4.5)):
+    """Donut chart of resource allocation (percent) by department"""
+    colors = theme['colors']
+    categories, allocation = data['categories'], data['allocation']
+
+    fig, ax = plt.subplots(figsize=figsize)
+
+    # Create custom colors with a professional palette, and "explode" the 1st slice
+    pie_colors = [colors['primary'], colors['secondary'], colors['accent1'], colors['accent2'], colors['accent3']]
+    explode = [0.05] + [0] * (len(allocation) - 1)
+
+    wedges, texts, autotexts = ax.pie(
+        allocation,
+        labels=None,  # We'll add custom legend instead
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=pie_colors,
+        explode=explode,
+        shadow=False,
+        wedgeprops={'edgecolor': 'white', 'linewidth': 2, 'antialiased': True},
+        textprops={'fontsize': 11, 'fontweight': 'bold', 'color': 'white'}
+    )
+
+    # Equal aspect ratio ensures that pie is drawn as a circle
+    ax.axis('equal')
+
+    # Add a circle at the center to make it a donut chart, titled in the middle
+    ax.add_artist(plt.Circle((0, 0), 0.3, fc='white', edgecolor='#E5E7EB'))
+    ax.text(0, 0, "Resources", ha='center', va='center', fontsize=12, fontweight='bold')
+
+    # Create custom legend
+    legend_labels = [f"{cat} ({alloc}%)" for cat, alloc in zip(categories, allocation)]
+    ax.legend(wedges, legend_labels, loc="center left", bbox_to_anchor=(1, 0, 0.5, 1))
+
+    ax.set_title('Resource Allocation by Department', fontsize=14, pad=15, fontweight='bold')
+    fig.patch.set_facecolor(colors['background'])
+
+    fig.tight_layout()
+    return fig
+
+
+def revenue_vs_expenses(data, theme, figsize=(10, 5)):
+    """Line chart of monthly revenue against expenses"""
+    fig, ax = plt.subplots(figsize=figsize)
+    ax.plot(data['months'], data['revenue'], marker='o', linewidth=2, color='#10B981', label='Revenue')
+    ax.plot(data['months'], data['expenses'], marker='o', linewidth=2, color='#F59E0B', label='Expenses')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Value')
+    ax.grid(True, linestyle='--', alpha=0.7)
+    ax.legend()
+    return fig
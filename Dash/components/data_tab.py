@@ -1,20 +1,82 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils.data_loader import load_data
+from utils.engines import get_table_engine
+from utils.filter_engine import filter_state_key
+from utils.exporter import EXPORT_FORMATS, prepare_export
+from utils.schema import detect_schema
+
+# Page sizes offered for the results table
+PAGE_SIZES = [25, 100, 500, 1000]
 
 def render_data_tab():
     """Render the Data Table tab content"""
     st.markdown("## Data Table")
 
-    # Load data
-    df = load_data()
-    
+    # Filters, results and download rerun on their own when one of their widgets changes
+    _data_table()
+
+@st.fragment
+def _data_table():
+    """Filter panel, results and download; an interaction here reruns only this fragment"""
+    # Load data into the configured engine (pandas in memory, or DuckDB over the columnar copy)
+    engine = get_table_engine()
+
     # Check if data is loaded
-    if df.empty:
+    if engine is None or engine.n_rows == 0:
         st.warning("No data available. Please ensure 'data.csv' exists and is properly formatted.")
         return
 
+    # Columns and dtypes come from the engine's empty template frame
+    version = engine.version
+    df = engine.template
+
+    # Get all available columns that can be used for filtering
+    all_columns = df.columns.tolist()
+    # Text can arrive as object, the pandas 3 str dtype (Polars labels) or categoricals
+    categorical_columns = [col for col in all_columns if pd.api.types.is_string_dtype(df[col].dtype)
+                         or isinstance(df[col].dtype, pd.CategoricalDtype)
+                         or col in ["Segment", "Country", "Product", "Discount Band", "Month Name", "Year"]]
+    facet_columns = categorical_columns[:6]
+
+    # Identify numeric columns for range sliders and choose two important ones
+    numeric_columns = [col for col in all_columns if pd.api.types.is_numeric_dtype(df[col])]
+    if numeric_columns:
+        units_col = next((col for col in numeric_columns if 'unit' in col.lower()), numeric_columns[0])
+        profit_col = next((col for col in numeric_columns if 'profit' in col.lower()),
+                         numeric_columns[1] if len(numeric_columns) > 1 else numeric_columns[0])
+    else:
+        units_col = None
+        profit_col = None
+
+    # The date-range filter runs on the schema's period column (or the first date column)
+    date_col = _date_column(df)
+
+    # Bring the range and date widgets up to date with the data first (appended rows can
+    # widen the bounds), so the counts below see the values the widgets will render
+    if numeric_columns:
+        min_units, max_units = (float(bound) for bound in engine.bounds(units_col))
+        _default_range("units_range", min_units, max_units)
+        min_profit, max_profit = (float(bound) for bound in engine.bounds(profit_col))
+        _default_range("profit_range", min_profit, max_profit)
+    if date_col:
+        min_date, max_date = (bound.date() for bound in engine.bounds(date_col))
+        _default_value("start_date", min_date)
+        _default_value("end_date", max_date)
+
+    # Count how many rows each option would return under the other filters, using the
+    # widget values from the last interaction (the widgets below render the same values)
+    state = st.session_state
+    categories, ranges = _active_filters(
+        engine, {column: state.get(f"filter_{column}", "All") for column in facet_columns},
+        units_col, state.get("units_range"), profit_col, state.get("profit_range"),
+        date_col, state.get("start_date"), state.get("end_date"))
+    current_search = (state.get("search_term", ""), state.get("search_scope", "All columns"))
+    current_key = filter_state_key(version, categories, ranges, current_search)
+    option_counts = engine.results.get_or_compute(
+        ("counts", current_key),
+        lambda: engine.facet_counts(facet_columns, categories, ranges, current_search))
+
     # Create filter section
     st.markdown("### Filters")
 
@@ -23,11 +85,6 @@ def render_data_tab():
             <div class="filter-container">
         """, unsafe_allow_html=True)
 
-        # Get all available columns that can be used for filtering
-        all_columns = df.columns.tolist()
-        categorical_columns = [col for col in all_columns if df[col].dtype == 'object' 
-                             or col in ["Segment", "Country", "Product", "Discount Band", "Month Name", "Year"]]
-        
         # Create two rows of filters with 3 columns each
         col1, col2, col3 = st.columns(3)
         col_map = {0: col1, 1: col2, 2: col3}
@@ -35,108 +92,71 @@ def render_data_tab():
         filter_selections = {}
 
         # Create filters for up to 6 categorical columns
-        for i, column in enumerate(categorical_columns[:6]):
+        for i, column in enumerate(facet_columns):
             col_idx = i % 3
             with col_map[col_idx]:
-                # Get unique values and add "All" option
-                unique_values = ["All"]
-                if column in df.columns:
-                    unique_values += sorted([str(x) for x in df[column].dropna().unique().tolist()])
-
-                # Create the selectbox
+                # Options come from the precomputed facet catalog, labelled with live counts
+                counts = option_counts[column]
                 filter_selections[column] = st.selectbox(
                     f"Filter by {column}",
-                    unique_values
+                    ["All"] + engine.facet_values(column),
+                    format_func=lambda value, counts=counts: value if value == "All"
+                    else f"{value} ({counts.get(value, 0):,})",
+                    key=f"filter_{column}"
                 )
 
-        # Identify numeric columns for range sliders
-        numeric_columns = [col for col in all_columns if pd.api.types.is_numeric_dtype(df[col])]
-        
         # Add numeric range sliders
         if numeric_columns:
             col1, col2 = st.columns(2)
-            
-            # Choose two important numeric columns for filtering
-            units_col = next((col for col in numeric_columns if 'unit' in col.lower()), numeric_columns[0])
-            profit_col = next((col for col in numeric_columns if 'profit' in col.lower()), 
-                             numeric_columns[1] if len(numeric_columns) > 1 else numeric_columns[0])
-            
+
             with col1:
-                min_units = float(df[units_col].min())
-                max_units = float(df[units_col].max())
-                units_range = st.slider(
-                    f"{units_col} Range", min_units, max_units, (min_units, max_units))
-                
+                units_range = st.slider(f"{units_col} Range", min_units, max_units, key="units_range")
+
             with col2:
-                min_profit = float(df[profit_col].min())
-                max_profit = float(df[profit_col].max())
-                profit_range = st.slider(
-                    f"{profit_col} Range", min_profit, max_profit, (min_profit, max_profit))
+                profit_range = st.slider(f"{profit_col} Range", min_profit, max_profit, key="profit_range")
         else:
-            units_col = None
-            profit_col = None
             units_range = None
             profit_range = None
-            
-        # Date filter if date column exists
-        if 'Date' in df.columns:
+
+        # Date filter if the dataset has a date column
+        if date_col:
             col1, col2 = st.columns(2)
-            
+
             with col1:
-                min_date = df["Date"].min()
-                max_date = df["Date"].max()
-                start_date = st.date_input("Start Date", min_date)
-                
+                start_date = st.date_input(f"Start Date ({date_col})", key="start_date")
+
             with col2:
-                end_date = st.date_input("End Date", max_date)
+                end_date = st.date_input(f"End Date ({date_col})", key="end_date")
         else:
             start_date = None
             end_date = None
 
-        # Add search box
-        search_term = st.text_input("Search in any column", "")
+        # Add search box, optionally scoped to a single column
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            search_term = st.text_input("Search in any column", "", key="search_term")
+        with col2:
+            search_scope = st.selectbox("Search in", ["All columns"] + all_columns, key="search_scope")
 
         st.markdown("</div>", unsafe_allow_html=True)
 
-    # Apply filters
-    filtered_df = df.copy()
-
-    # Filter by date if date column exists
-    if 'Date' in filtered_df.columns and start_date and end_date:
-        filtered_df = filtered_df[(filtered_df["Date"] >= start_date) & (filtered_df["Date"] <= end_date)]
-
-    # Apply all column filters
-    for column, selection in filter_selections.items():
-        if selection != "All" and column in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df[column].astype(str) == selection]
-
-    # Filter by units range if applicable
-    if units_col and units_range:
-        filtered_df = filtered_df[(filtered_df[units_col] >= units_range[0]) & 
-                                 (filtered_df[units_col] <= units_range[1])]
-
-    # Filter by profit range if applicable
-    if profit_col and profit_range:
-        filtered_df = filtered_df[(filtered_df[profit_col] >= profit_range[0]) & 
-                                 (filtered_df[profit_col] <= profit_range[1])]
-
-    # Apply search if entered
-    if search_term:
-        search_mask = filtered_df.astype(str).apply(
-            lambda x: x.str.contains(search_term, case=False)).any(axis=1)
-        filtered_df = filtered_df[search_mask]
-
-    # Format the DataFrame for display
-    display_df = filtered_df.copy()
+    # Apply all filters (and search hits) as one fused mask over the precomputed indexes;
+    # filter states seen recently (by any session) are answered from the result cache
+    categories, ranges = _active_filters(
+        engine, filter_selections, units_col, units_range, profit_col, profit_range,
+        date_col, start_date, end_date)
+    search = (search_term, search_scope)
+    state_key = filter_state_key(version, categories, ranges, search)
+    rows = engine.results.get_or_compute(
+        ("rows", state_key),
+        lambda: engine.filter_rows(categories, ranges, search))
 
-    # Format currency columns
+    # Format currency columns in the browser: values stay numeric on the wire and
+    # no formatted copy of the frame is built on the server
     currency_columns = ['Manufacturing Price', 'Sale Price', 'Gross Sales',
                         'Discounts', 'Sales', 'COGS', 'Profit']
-
-    for col in currency_columns:
-        if col in display_df.columns:
-            display_df[col] = display_df[col].apply(
-                lambda x: f"${x:,.2f}" if pd.notnull(x) else "")
+    column_config = {col: st.column_config.NumberColumn(col, format="dollar")
+                     for col in currency_columns if col in df.columns}
 
     # Display filtered data
     st.markdown("### Results")
@@ -146,31 +166,122 @@ def render_data_tab():
             <div class="data-table-container">
         """, unsafe_allow_html=True)
 
-        # Show number of results
-        st.write(f"Showing {len(filtered_df)} of {len(df)} entries")
+        # Show number of results (counted by the filter engine, nothing is materialized)
+        st.write(f"Showing {len(rows):,} of {engine.n_rows:,} entries")
 
         # Add column selection for the table
-        all_columns = filtered_df.columns.tolist()
         with st.expander("Select columns to display"):
             selected_columns = st.multiselect(
                 "Choose columns",
                 options=all_columns,
-                default=all_columns
+                default=all_columns,
+                key="table_columns"
             )
 
-        # Display the data table with only selected columns
-        if selected_columns:
-            st.dataframe(display_df[selected_columns], use_container_width=True)
-        else:
-            st.dataframe(display_df, use_container_width=True)
-
-        # Download button for filtered data
-        csv = filtered_df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Download Filtered Data",
-            data=csv,
-            file_name="filtered_data.csv",
-            mime="text/csv",
+        # Paging and server-side sort controls
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            sort_column = st.selectbox("Sort by", ["(none)"] + all_columns, key="table_sort")
+        with col2:
+            sort_order = st.selectbox("Order", ["Ascending", "Descending"], key="table_order")
+        with col3:
+            st.session_state.setdefault("table_page_size", PAGE_SIZES[1])
+            page_size = st.selectbox("Rows per page", PAGE_SIZES, key="table_page_size")
+
+        n_pages = max(1, -(-len(rows) // page_size))
+        # Filters may have shrunk the result since the page was chosen
+        if st.session_state.get("table_page", 1) > n_pages:
+            st.session_state.table_page = n_pages
+        with col4:
+            st.session_state.setdefault("table_page", 1)
+            page = st.number_input("Page", min_value=1, max_value=n_pages, key="table_page")
+
+        # Only the visible window of rows, in the selected columns, is sliced and sent
+        page_df = engine.page(
+            rows,
+            columns=selected_columns or None,
+            sort_column=None if sort_column == "(none)" else sort_column,
+            ascending=sort_order == "Ascending",
+            offset=(page - 1) * page_size,
+            limit=page_size,
         )
+        st.dataframe(page_df, column_config=column_config, use_container_width=True)
+        st.caption(f"Page {page:,} of {n_pages:,}")
+
+        # Download filtered data: the export is only built when asked for, streamed to
+        # disk in chunks and reused for as long as the filters and dataset stay the same.
+        # The download button is only rendered in the run that prepared the file, since
+        # Streamlit reads the whole file into memory each time the button is drawn
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            export_format = st.selectbox("Download format", list(EXPORT_FORMATS), key="export_format")
+
+        with col2:
+            if st.button("Prepare Download"):
+                with st.spinner("Preparing download..."):
+                    export_path = prepare_export(engine, rows, export_format, state_key)
+                with open(export_path, "rb") as f:
+                    st.download_button(
+                        label="Download Filtered Data",
+                        data=f,
+                        file_name=f"filtered_data.{EXPORT_FORMATS[export_format]['extension']}",
+                        mime=EXPORT_FORMATS[export_format]["mime"],
+                        # Downloading doesn't rerun the fragment, so the button stays until the next interaction
+                        on_click="ignore",
+                    )
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+def _default_range(key, low, high):
+    """Start a range slider at its full range, and keep the ends the user hasn't moved at the data's bounds
+
+    Widgets take their values from session state (not a default argument) so
+    that their state can be kept while another section is shown. The bounds a
+    value was defaulted from are kept too, so an end still sitting on the old
+    bound follows the data when appended rows widen it.
+    """
+    bounds_key = f"default_{key}"
+    value = st.session_state.get(key)
+    old_low, old_high = st.session_state.get(bounds_key, (None, None))
+    if value is None:
+        start, end = low, high
+    else:
+        start = low if value[0] == old_low else min(max(value[0], low), high)
+        end = high if value[1] == old_high else min(max(value[1], start), high)
+    if value != (start, end):
+        st.session_state[key] = (start, end)
+    st.session_state[bounds_key] = (low, high)
+
+def _default_value(key, default):
+    """Start a widget at a default that follows the data (e.g. the first date) until the user changes it"""
+    default_key = f"default_{key}"
+    if key not in st.session_state or st.session_state[key] == st.session_state.get(default_key):
+        st.session_state[key] = default
+    st.session_state[default_key] = default
+
+def _date_column(df):
+    """Return the column for the date-range filter: the schema's period column, else the first date column"""
+    schema = detect_schema(df.columns) or {}
+    date_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    return next((col for col in date_columns if schema.get(col, {}).get("period")),
+                date_columns[0] if date_columns else None)
+
+def _active_filters(engine, selections, units_col, units_range, profit_col, profit_range,
+                    date_col, start_date, end_date):
+    """Turn widget values into the (categories, ranges) filters understood by the filter engine"""
+    categories = {column: selection for column, selection in selections.items()
+                  if selection != "All" and column in engine.template.columns}
+    ranges = []
+
+    # Filter by date if the dataset has a date column (whole days, end date inclusive)
+    if date_col and start_date and end_date:
+        ranges.append((date_col, pd.Timestamp(start_date),
+                       pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(1, unit="ns")))
+
+    # Filter by units and profit ranges if applicable
+    if units_col and units_range:
+        ranges.append((units_col, units_range[0], units_range[1]))
+    if profit_col and profit_range:
+        ranges.append((profit_col, profit_range[0], profit_range[1]))
 
-        st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+    return categories, ranges
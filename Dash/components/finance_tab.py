@@ -1,38 +1,14 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from utils.metrics import get_kpis
+from components.kpi_tiles import render_kpi_tiles
+from components.charts import revenue_vs_expenses
+from utils.chart_cache import ChartBatch
 
 def render_finance_tab():
-    """Render the Finance & Reports tab content with dummy values"""
-    # Metrics row
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Total Revenue</p>
-                <h2 style="margin: 0;">₹1,24,50,000</h2>
-                <p style="color: #10B981; margin: 5px 0;">+8.5% vs last month</p>
-            </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Budget Utilized</p>
-                <h2 style="margin: 0;">78%</h2>
-                <p style="color: #6B7280; margin: 5px 0;">₹98,45,000 of ₹1,26,00,000</p>
-            </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Pending Approvals</p>
-                <h2 style="margin: 0;">12</h2>
-                <p style="color: #F59E0B; margin: 5px 0;">4 high priority</p>
-            </div>
-        """, unsafe_allow_html=True)
+    """Render the Finance & Reports tab content (live metrics, dummy values elsewhere)"""
+    # Metrics row, computed from the loaded dataset (see utils.metrics)
+    render_kpi_tiles(get_kpis("finance"))
 
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -41,21 +17,17 @@ def render_finance_tab():
         st.markdown("### Revenue vs Expenses")
 
         # Create sample data for the graph
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-        revenue = [100, 120, 125, 130, 140, 160]
-        expenses = [110, 105, 100, 95, 100, 105]
-
-        # Create a matplotlib figure instead of plotly to avoid the orjson issue
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.plot(months, revenue, marker='o', linewidth=2, color='#10B981', label='Revenue')
-        ax.plot(months, expenses, marker='o', linewidth=2, color='#F59E0B', label='Expenses')
-        ax.set_xlabel('Month')
-        ax.set_ylabel('Value')
-        ax.grid(True, linestyle='--', alpha=0.7)
-        ax.legend()
-        
-        # Use Streamlit's matplotlib display
-        st.pyplot(fig)
+        finance_data = {
+            'months': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun'],
+            'revenue': [100, 120, 125, 130, 140, 160],
+            'expenses': [110, 105, 100, 95, 100, 105],
+        }
+
+        # Rendered with matplotlib (instead of plotly, to avoid the orjson issue) in the
+        # chart pool, and served as a cached image while the data stays the same
+        charts = ChartBatch()
+        charts.show("finance_revenue_vs_expenses", revenue_vs_expenses, finance_data,
+                    {'style': 'seaborn-v0_8-whitegrid'}, (10, 5))
 
         st.markdown("### Recent Documents")
 
@@ -139,4 +111,7 @@ def render_finance_tab():
                     st.markdown(
                         "<div style='color: #10B981; text-align: right;'>+₹1,45,000</div>", unsafe_allow_html=True)
 
-                st.markdown("</div>", unsafe_allow_html=True)
\ No newline at end of file
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    # Swap the chart placeholder for the rendered image once it comes in
+    charts.wait()
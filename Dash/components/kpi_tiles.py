@@ -0,0 +1,31 @@
+import streamlit as st
+
+# Delta colors: good change, bad change, no change / no comparison
+DELTA_COLORS = {True: "#10B981", False: "#EF4444", None: "#6B7280"}
+
+
+def render_kpi_tiles(tiles, accents=None):
+    """Render KPI tiles from utils.metrics in a row of metric containers
+
+    accents optionally gives a left-border color per tile (as on the home page).
+    """
+    if not tiles:
+        st.info("No metrics available. Please ensure 'data.csv' exists and is properly formatted.")
+        return
+
+    for i, (column, tile) in enumerate(zip(st.columns(len(tiles)), tiles)):
+        style = ""
+        if accents:
+            style = f' style="border-left: 4px solid {accents[i % len(accents)]}; padding-left: 16px;"'
+        if tile["delta"]:
+            footer = f'{tile["delta"]} <span style="color: #6B7280;">({tile["comparison"]})</span>'
+        else:
+            footer = "&nbsp;"
+        with column:
+            st.markdown(f"""
+                <div class="metric-container"{style}>
+                    <p style="color: #6B7280; margin-bottom: 5px; font-size: 14px;">{tile["label"]}</p>
+                    <h2 style="margin: 0; font-size: 28px; font-weight: 700;">{tile["value"]}</h2>
+                    <p style="color: {DELTA_COLORS[tile["good"]]}; margin: 5px 0; font-size: 14px;">{footer}</p>
+                </div>
+            """, unsafe_allow_html=True)
@@ -1,33 +1,11 @@
 import streamlit as st
+from utils.metrics import get_kpis
+from components.kpi_tiles import render_kpi_tiles
 
 def render_project_tab():
-    """Render the Project Management tab content with dummy values"""
-    # Metrics row
-    col1, col2, col3 = st.columns(3)
-
-    with col1:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Total Projects</p>
-                <h2 style="margin: 0;">24</h2>
-            </div>
-        """, unsafe_allow_html=True)
-
-    with col2:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Team Performance</p>
-                <h2 style="margin: 0;">87%</h2>
-            </div>
-        """, unsafe_allow_html=True)
-
-    with col3:
-        st.markdown("""
-            <div class="metric-container">
-                <p style="color: #6B7280; margin-bottom: 5px;">Deadlines Met</p>
-                <h2 style="margin: 0;">92%</h2>
-            </div>
-        """, unsafe_allow_html=True)
+    """Render the Project Management tab content (live metrics, dummy values elsewhere)"""
+    # Metrics row, computed from the loaded dataset (see utils.metrics)
+    render_kpi_tiles(get_kpis("project"))
 
     # Main content area
     col1, col2 = st.columns([2, 1])
@@ -0,0 +1,37 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# The app imports its modules as utils.* / components.* from the Dash directory
+DASH_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DASH_DIR)
+
+DATA_CSV = os.path.join(DASH_DIR, "data.csv")
+
+
+@pytest.fixture
+def data_csv(tmp_path):
+    """A private copy of the shipped data.csv, so columnar copies are written next to it"""
+    path = tmp_path / "data.csv"
+    shutil.copyfile(DATA_CSV, path)
+    return str(path)
+
+
+def append_rows(path, lines):
+    """Append raw CSV lines to a dataset file, as an external writer would"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(line + "\n" for line in lines))
+
+
+def data_lines(path):
+    """Return the data rows of a CSV file as raw lines (without the header)"""
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def new_label_rows(count):
+    """Raw CSV lines for loans with an education label data.csv doesn't have"""
+    return [f"new{i:05d},PAIDOFF,1200,30,9/14/2016,10/13/2016,10/1/2016 10:00,,30,Doctorate,female"
+            for i in range(count)]
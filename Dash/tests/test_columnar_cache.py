@@ -0,0 +1,112 @@
+import os
+
+import pandas as pd
+
+from utils.columnar_cache import (MAX_CACHE_PARTS, cached_files, file_digest, find_appended_range,
+                                  read_cached_frame, source_fingerprint, write_cached_frame)
+from utils.data_loader import append_csv_tail, ingest_csv_chunked, read_dataset_csv
+from utils.schema import concat_frames
+
+from conftest import append_rows, data_lines, new_label_rows
+
+
+def test_cached_frame_matches_parse(data_csv):
+    parsed = read_dataset_csv(data_csv)
+    assert write_cached_frame(data_csv, parsed.copy(), source_fingerprint(data_csv))
+
+    cached = read_cached_frame(data_csv)
+    assert cached.dtypes.equals(parsed.dtypes)
+    pd.testing.assert_frame_equal(cached, parsed)
+
+
+def test_streamed_copy_matches_parse(data_csv):
+    assert ingest_csv_chunked(data_csv, chunk_rows=64)
+
+    parsed = read_dataset_csv(data_csv)
+    cached = read_cached_frame(data_csv)
+    assert cached.dtypes.equals(parsed.dtypes)
+    pd.testing.assert_frame_equal(cached, parsed, check_categorical=False)
+
+
+def test_appended_part_matches_parse(data_csv):
+    assert ingest_csv_chunked(data_csv)
+    append_rows(data_csv, data_lines(data_csv)[:40])
+
+    assert append_csv_tail(data_csv) == 500
+    parsed = read_dataset_csv(data_csv)
+    cached = read_cached_frame(data_csv)
+    assert cached.dtypes.equals(parsed.dtypes)
+    pd.testing.assert_frame_equal(cached, parsed, check_categorical=False)
+
+
+def test_append_found_by_prefix_hash(data_csv):
+    assert ingest_csv_chunked(data_csv)
+    old_size = os.path.getsize(data_csv)
+    append_rows(data_csv, data_lines(data_csv)[:5])
+
+    meta, fingerprint, start, end = find_appended_range(data_csv)
+    assert (start, end) == (old_size, os.path.getsize(data_csv))
+    assert fingerprint["digest"] == file_digest(data_csv)
+
+
+def test_rewritten_prefix_is_not_an_append(data_csv):
+    assert ingest_csv_chunked(data_csv)
+    lines = data_lines(data_csv)
+    # Same length, one byte changed in the first row, then new rows after it
+    with open(data_csv, "r+", encoding="utf-8") as f:
+        header = f.readline()
+        f.seek(len(header))
+        f.write(lines[0].replace("PAIDOFF", "PAIDOFX", 1))
+    append_rows(data_csv, lines[:5])
+
+    assert find_appended_range(data_csv) is None
+    assert append_csv_tail(data_csv) is None
+
+
+def test_completed_last_line_is_not_an_append(data_csv):
+    with open(data_csv, "rb+") as f:
+        f.truncate(os.path.getsize(data_csv) - 1)
+    assert ingest_csv_chunked(data_csv)
+    # The first "appended" byte finishes the old last row instead of starting a new one
+    with open(data_csv, "a", encoding="utf-8") as f:
+        f.write("\n")
+    append_rows(data_csv, data_lines(data_csv)[:5])
+
+    assert find_appended_range(data_csv) is None
+
+
+def test_parts_fold_past_max_parts(data_csv):
+    assert ingest_csv_chunked(data_csv)
+    part_counts = []
+    for _ in range(MAX_CACHE_PARTS + 1):
+        append_rows(data_csv, data_lines(data_csv)[:10])
+        assert append_csv_tail(data_csv) is not None
+        part_counts.append(len(cached_files(data_csv)))
+
+    # One part per append up to the limit, then everything folds into one file
+    assert part_counts == list(range(2, MAX_CACHE_PARTS + 1)) + [1, 2]
+    parsed = read_dataset_csv(data_csv)
+    cached = read_cached_frame(data_csv)
+    assert cached.dtypes.equals(parsed.dtypes)
+    pd.testing.assert_frame_equal(cached, parsed, check_categorical=False)
+
+
+def test_new_labels_merge_across_parts(data_csv):
+    assert ingest_csv_chunked(data_csv)
+    append_rows(data_csv, new_label_rows(3))
+    assert append_csv_tail(data_csv) == 500
+
+    cached = read_cached_frame(data_csv)
+    assert isinstance(cached["education"].dtype, pd.CategoricalDtype)
+    assert set(cached["education"].cat.categories) == set(read_dataset_csv(data_csv)["education"].dropna())
+    pd.testing.assert_frame_equal(cached, read_dataset_csv(data_csv), check_categorical=False)
+
+
+def test_concat_frames_unions_categories():
+    first = pd.DataFrame({"label": pd.Categorical(["a", "b"])})
+    second = pd.DataFrame({"label": pd.Categorical(["c", "a"])})
+
+    combined = concat_frames([first, second])
+    assert isinstance(combined["label"].dtype, pd.CategoricalDtype)
+    assert sorted(combined["label"].cat.categories) == ["a", "b", "c"]
+    assert combined["label"].tolist() == ["a", "b", "c", "a"]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.data_loader import read_dataset_csv
+from utils.filter_engine import FilterEngine
+
+from conftest import DATA_CSV
+
+FACETS = ["loan_status", "education", "Gender"]
+
+# (categories, ranges, search) as the data tab passes them
+STATES = [
+    ({}, [], None),
+    ({"loan_status": "PAIDOFF"}, [("Principal", 800, 1000)], ("bech", "education")),
+    ({"Gender": "male", "education": "college"},
+     [("effective_date", pd.Timestamp("2016-09-10"), pd.Timestamp("2016-09-14"))], None),
+    ({}, [("age", 30, 40)], ("xqd2016", "All columns")),
+    # Terms under three characters scan instead of using the trigram postings
+    ({"loan_status": "COLLECTION"}, [], ("ma", "Gender")),
+    ({"education": "no such label"}, [], None),
+]
+
+
+@pytest.fixture(scope="module")
+def df():
+    return read_dataset_csv(DATA_CSV)
+
+
+def _pandas_masks(df, categories, ranges, search):
+    """The same filters as plain pandas comparisons, keyed like FilterEngine._masks"""
+    masks = [(column, (df[column].astype(str) == str(label)).to_numpy())
+             for column, label in categories.items()]
+    masks += [(column, df[column].between(low, high).to_numpy()) for column, low, high in ranges]
+    if search:
+        term, scope = search
+        columns = df.columns if scope == "All columns" else [scope]
+        found = [df[c].notna() & df[c].astype(str).str.lower().str.contains(term, regex=False)
+                 for c in columns]
+        masks.append((None, np.logical_or.reduce([column.to_numpy() for column in found])))
+    return masks
+
+
+def _combine(df, masks, skip=object()):
+    mask = np.ones(len(df), dtype=bool)
+    for column, column_mask in masks:
+        if column != skip:
+            mask &= column_mask
+    return mask
+
+
+@pytest.mark.parametrize("categories, ranges, search", STATES)
+def test_filter_rows_match_pandas(df, categories, ranges, search):
+    engine = FilterEngine(df, version=1)
+
+    rows = engine.filter_rows(categories, ranges, search)
+    expected = np.flatnonzero(_combine(df, _pandas_masks(df, categories, ranges, search)))
+    np.testing.assert_array_equal(rows, expected)
+
+
+@pytest.mark.parametrize("categories, ranges, search", STATES)
+def test_facet_counts_match_pandas(df, categories, ranges, search):
+    engine = FilterEngine(df, version=1)
+    masks = _pandas_masks(df, categories, ranges, search)
+
+    counts = engine.facet_counts(FACETS, categories, ranges, search)
+    for column in FACETS:
+        # Each option is counted under every filter except the one on its own column
+        values = df.loc[_combine(df, masks, skip=column), column].dropna().astype(str)
+        assert {label: n for label, n in counts[column].items() if n} == values.value_counts().to_dict()
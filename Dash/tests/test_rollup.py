@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from utils import rollup
+from utils.data_loader import read_dataset_csv
+from utils.rollup import RollupCube, get_rollup_cube
+
+from conftest import append_rows, data_lines, new_label_rows
+
+SLICES = [
+    None,
+    {"loan_status": "PAIDOFF"},
+    {"Gender": "female", "education": ["Bechalor", "Doctorate"]},
+    {"terms": 30, "loan_status": ["COLLECTION", "COLLECTION_PAIDOFF"]},
+]
+
+
+@pytest.fixture(params=["known labels", "new label"])
+def grown(request, data_csv):
+    """(frame before the append, frame after it) for data.csv plus 20 appended rows"""
+    base = read_dataset_csv(data_csv)
+    if request.param == "new label":
+        append_rows(data_csv, new_label_rows(20))
+    else:
+        # No new labels, so the cube's arrays keep their shape and are updated in place
+        append_rows(data_csv, data_lines(data_csv)[:20])
+    return base, read_dataset_csv(data_csv)
+
+
+def _pandas_totals(df, filters):
+    mask = np.ones(len(df), dtype=bool)
+    for column, selection in (filters or {}).items():
+        labels = selection if isinstance(selection, list) else [selection]
+        mask &= df[column].astype(str).isin([str(label) for label in labels]).to_numpy()
+    rows = df[mask]
+    return {"rows": len(rows), "Principal": float(rows["Principal"].sum()),
+            "past_due_days_count": int(rows["past_due_days"].notna().sum())}
+
+
+@pytest.mark.parametrize("filters", SLICES)
+def test_extended_cube_matches_rebuild(grown, filters):
+    base, full = grown
+    cube = RollupCube.from_frame(base, version=1)
+    extended = cube.copy(version=2)
+    extended.add(full.iloc[len(base):])
+
+    totals = extended.totals(filters)
+    assert totals == RollupCube.from_frame(full, version=2).totals(filters)
+    assert {key: totals[key] for key in ("rows", "Principal", "past_due_days_count")} \
+        == _pandas_totals(full, filters)
+    # The copy is independent of the cube it was made from
+    assert cube.totals(filters)["rows"] == _pandas_totals(base, filters)["rows"]
+
+
+def test_group_after_append(grown):
+    base, full = grown
+    extended = RollupCube.from_frame(base).copy()
+    extended.add(full.iloc[len(base):])
+
+    groups = extended.group("education")["rows"].to_dict()
+    assert groups == full["education"].astype(str).value_counts().to_dict()
+
+
+def test_get_rollup_cube_extends_the_previous_version(grown, monkeypatch):
+    base, full = grown
+    monkeypatch.setattr(rollup, "_latest_cube", None)
+    monkeypatch.setattr(rollup, "appended_base", lambda version: len(base) if version == 2 else None)
+    # Any rebuild after the first version would mean the append path was skipped
+    builds = []
+    from_frame = RollupCube.from_frame.__func__
+    monkeypatch.setattr(RollupCube, "from_frame",
+                        classmethod(lambda cls, df, version=None: builds.append(version)
+                                    or from_frame(cls, df, version)))
+
+    first = get_rollup_cube(base, 1)
+    second = get_rollup_cube(full, 2)
+    assert builds == [1]
+    assert second is not first and first.n_rows == len(base)
+    for filters in SLICES:
+        assert second.totals(filters) == from_frame(RollupCube, full).totals(filters)
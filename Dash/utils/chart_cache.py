@@ -0,0 +1,84 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+
+from utils.chart_render import chart_key, render_png
+from utils.filter_engine import ResultCache
+
+# Memory budget for rendered chart images shared by all sessions
+CHART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Worker processes rendering charts in parallel (matplotlib holds the GIL, so threads wouldn't help)
+CHART_WORKERS = min(4, os.cpu_count() or 1)
+
+
+@st.cache_resource
+def get_chart_cache():
+    """Return the process-wide LRU of rendered chart images"""
+    return ResultCache(CHART_CACHE_MAX_BYTES)
+
+
+@st.cache_resource
+def get_chart_pool():
+    """Return the process pool that renders charts
+
+    Workers are spawned rather than forked so they don't inherit the server's
+    threads and locks.
+    """
+    return ProcessPoolExecutor(max_workers=CHART_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+
+class ChartBatch:
+    """The charts of one page, rendered in parallel by the chart pool
+
+    show() reserves a chart's place in the layout: a cached chart is drawn
+    straight away, any other gets a placeholder and is sent to the pool.
+    wait() then fills the placeholders as the images arrive, so a cold page
+    takes about as long as its slowest chart instead of the sum of all of them.
+    """
+
+    def __init__(self):
+        self._pending = []
+
+    def show(self, chart_id, builder, data, theme, figsize):
+        key = chart_key(chart_id, data, theme, figsize)
+        png = get_chart_cache().get(key)
+        if png is not None:
+            st.image(png, use_container_width=True)
+            return
+
+        placeholder = st.empty()
+        placeholder.info("Rendering chart...")
+        args = (builder, data, theme, figsize)
+        try:
+            future = get_chart_pool().submit(render_png, *args)
+        except (BrokenProcessPool, RuntimeError):
+            # A dead or shut down pool is replaced next time; render this one here
+            get_chart_pool.clear()
+            future = None
+        self._pending.append((placeholder, key, args, future))
+
+    def wait(self):
+        """Fill every placeholder with its chart, in the order the renders finish"""
+        pending, self._pending = self._pending, []
+        futures = {item[3]: item for item in pending if item[3] is not None}
+        for placeholder, key, args, future in pending:
+            if future is None:
+                self._fill(placeholder, key, render_png(*args))
+
+        for future in as_completed(futures):
+            placeholder, key, args, _ = futures[future]
+            try:
+                png = future.result()
+            except BrokenProcessPool:
+                get_chart_pool.clear()
+                png = render_png(*args)
+            self._fill(placeholder, key, png)
+
+    @staticmethod
+    def _fill(placeholder, key, png):
+        get_chart_cache().put(key, png)
+        placeholder.image(png, use_container_width=True)
@@ -0,0 +1,157 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import streamlit as st
+
+from utils.chart_store import get_chart_store
+
+# Memory budgets for chat charts: per session, and for all sessions together
+CHART_SESSION_MAX_BYTES = int(os.environ.get("DASH_CHART_SESSION_BYTES", 16 * 1024 * 1024))
+CHART_MEMORY_MAX_BYTES = int(os.environ.get("DASH_CHART_MEMORY_BYTES", 256 * 1024 * 1024))
+
+
+class ChartMemory:
+    """Process-wide LRU of chat chart images with a per-session and a global byte budget
+
+    Charts past either budget are evicted least recently used first and
+    spilled to the on-disk chart store, from where get() reloads them on
+    demand, so evicted charts still show in the gallery.
+    """
+
+    def __init__(self, store, session_max_bytes=CHART_SESSION_MAX_BYTES, max_bytes=CHART_MEMORY_MAX_BYTES):
+        self.store = store
+        self.session_max_bytes = session_max_bytes
+        self.max_bytes = max_bytes
+        # (session key, chart id) -> PNG bytes, least recently used first
+        self._entries = OrderedDict()
+        self._session_bytes = {}
+        self._bytes = 0
+        # chart id -> digest in the chart store, for charts evicted from memory
+        self._spilled = {}
+        # (session key, chart id) -> PNG bytes, evicted but not yet written to the store
+        self._pending = {}
+        self.spilled = 0
+        self.reloaded = 0
+        self._lock = threading.Lock()
+        store.on_sweep(self._forget_swept)
+
+    def _evict(self, key):
+        """Move a chart out of the budgets into the pending spills (caller holds the lock)"""
+        png = self._entries.pop(key)
+        self._bytes -= len(png)
+        self._session_bytes[key[0]] -= len(png)
+        if not self._session_bytes[key[0]]:
+            del self._session_bytes[key[0]]
+        self._pending[key] = png
+        return key
+
+    def _spill(self, keys):
+        """Write evicted charts to the chart store, outside the lock so disk I/O doesn't block readers"""
+        for key in keys:
+            with self._lock:
+                png = self._pending.get(key)
+            if png is None:
+                # Evicted twice before the first spill finished; that spill wrote it
+                continue
+            try:
+                digest = self.store.put(png)
+            except OSError:
+                # Nowhere to spill to: the chart is dropped and the gallery says so
+                digest = None
+            with self._lock:
+                self._pending.pop(key, None)
+                if digest is not None:
+                    self._spilled[key[1]] = digest
+                    self.spilled += 1
+
+    def _forget_swept(self, digests):
+        """Drop the spilled charts whose images the chart store has just swept"""
+        with self._lock:
+            self._spilled = {chart_id: digest for chart_id, digest in self._spilled.items()
+                             if digest not in digests}
+
+    def put(self, session_key, chart_id, png):
+        """Store a chart, evicting older charts past the session's or the global budget"""
+        key = (session_key, chart_id)
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = png
+            self._bytes += len(png)
+            self._session_bytes[session_key] = self._session_bytes.get(session_key, 0) + len(png)
+
+            # The newest chart always stays in memory, even if it is alone over budget
+            while self._session_bytes[session_key] > self.session_max_bytes:
+                oldest = next(k for k in self._entries if k[0] == session_key)
+                if oldest == key:
+                    break
+                evicted.append(self._evict(oldest))
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    break
+                evicted.append(self._evict(oldest))
+        self._spill(evicted)
+
+    def get(self, session_key, chart_id):
+        """Return a chart's PNG bytes, reloading it from the chart store if evicted, or None"""
+        key = (session_key, chart_id)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if key in self._pending:
+                return self._pending[key]
+            digest = self._spilled.get(chart_id)
+        png = None if digest is None else self.store.get(digest)
+        with self._lock:
+            if png is None:
+                # Never stored, or swept from the store since it was evicted
+                self._spilled.pop(chart_id, None)
+                return None
+            self.reloaded += 1
+        self.put(session_key, chart_id, png)
+        return png
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries or key in self._pending or key[1] in self._spilled
+
+    def stats(self):
+        with self._lock:
+            return {"charts": len(self._entries), "bytes": self._bytes, "sessions": len(self._session_bytes),
+                    "spilled": self.spilled, "reloaded": self.reloaded}
+
+
+@st.cache_resource
+def get_chart_memory():
+    """Return the chart memory shared by all sessions"""
+    return ChartMemory(get_chart_store())
+
+
+class SessionCharts:
+    """One session's view of the shared chart memory, kept as st.session_state.memory_images"""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.session_key = uuid.uuid4().hex
+
+    def __setitem__(self, chart_id, png):
+        self.memory.put(self.session_key, chart_id, png)
+
+    def get(self, chart_id):
+        return self.memory.get(self.session_key, chart_id)
+
+    def __contains__(self, chart_id):
+        return (self.session_key, chart_id) in self.memory
+
+
+def session_charts():
+    """Return this session's chart store, creating it on first use"""
+    if not isinstance(st.session_state.get("memory_images"), SessionCharts):
+        st.session_state.memory_images = SessionCharts(get_chart_memory())
+    return st.session_state.memory_images
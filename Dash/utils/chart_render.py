@@ -0,0 +1,33 @@
+import hashlib
+import io
+import json
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+# Chart rendering without Streamlit, so the chart pool's worker processes stay light
+
+# Resolution charts are rendered at
+CHART_DPI = 100
+
+
+def chart_key(chart_id, data, theme, figsize):
+    """Return the cache key of a chart: its id plus a hash of its data, theme and size"""
+    state = json.dumps([data, theme, list(figsize), CHART_DPI], sort_keys=True, default=str)
+    return chart_id, hashlib.blake2b(state.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def render_png(builder, data, theme, figsize):
+    """Build a chart under its theme's style and return it as PNG bytes, closing the figure"""
+    # Worker processes have no display; the server already renders off-screen
+    if matplotlib.get_backend().lower() != "agg":
+        plt.switch_backend("Agg")
+    with plt.style.context(theme.get("style", "default")):
+        fig = builder(data, theme, figsize)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format="png", dpi=CHART_DPI, bbox_inches="tight")
+            return buffer.getvalue()
+        finally:
+            # Closed figures leave pyplot's registry, so rendering doesn't leak memory
+            plt.close(fig)
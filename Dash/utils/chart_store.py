@@ -0,0 +1,215 @@
+import hashlib
+import os
+import threading
+import time
+import weakref
+
+import streamlit as st
+
+# Where chart images are kept on disk, named by the hash of their bytes
+CHART_STORE_DIR = os.path.join("exports", "charts")
+
+# Limits enforced by the background sweeper: total size, and time since last use
+CHART_STORE_MAX_BYTES = int(os.environ.get("DASH_CHART_STORE_BYTES", 512 * 1024 * 1024))
+CHART_STORE_TTL_SECONDS = int(os.environ.get("DASH_CHART_STORE_TTL", 24 * 60 * 60))
+SWEEP_INTERVAL_SECONDS = 300.0
+
+# Loose chart files PandasAI writes next to the store (temp_chart_<uuid>.png), and
+# how long they are left alone in case PandasAI is still writing or reading them
+TEMP_CHART_PREFIX = "temp_chart_"
+TEMP_CHART_GRACE_SECONDS = 60
+
+
+class ChartStore:
+    """Content-addressed store of PNG chart images with a size cap and a TTL
+
+    A chart is stored under the hash of its bytes, so saving an identical
+    chart again only refreshes its last-use time. The store keeps an index
+    of its files in memory (built with one scan at startup), so lookups,
+    stats and sweeps never list the shards. A daemon thread moves loose temp
+    charts into the store, then evicts charts unused for longer than the TTL
+    and the least recently used ones until the store is under its size cap.
+    """
+
+    def __init__(self, root=CHART_STORE_DIR, max_bytes=CHART_STORE_MAX_BYTES,
+                 ttl=CHART_STORE_TTL_SECONDS, interval=SWEEP_INTERVAL_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.interval = interval
+        self._lock = threading.Lock()
+        # digest -> (size, last use as a unix time)
+        self._index = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.swept = 0
+        self._sweep_listeners = []
+        os.makedirs(root, exist_ok=True)
+        self._load_index()
+        self._thread = threading.Thread(target=self._run, name=f"sweep:{root}", daemon=True)
+        self._thread.start()
+
+    def on_sweep(self, listener):
+        """Call a bound method with the set of digests each sweep removes (held weakly)"""
+        with self._lock:
+            self._sweep_listeners.append(weakref.WeakMethod(listener))
+
+    def _notify_swept(self, digests):
+        with self._lock:
+            self._sweep_listeners = [ref for ref in self._sweep_listeners if ref() is not None]
+            listeners = [ref() for ref in self._sweep_listeners]
+        for listener in listeners:
+            if listener is not None:
+                listener(digests)
+
+    def _path(self, digest):
+        # Two-character shards keep every directory small
+        return os.path.join(self.root, digest[:2], f"{digest}.png")
+
+    def _load_index(self):
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue
+            items = list(os.scandir(entry.path))
+            for item in items:
+                if item.name.endswith(".png"):
+                    stat = item.stat()
+                    self._index[item.name[:-4]] = (stat.st_size, stat.st_mtime)
+                    self._bytes += stat.st_size
+            if not items:
+                self._remove_shard(entry.path)
+
+    @staticmethod
+    def _remove_shard(directory):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            # Not empty (a chart was just written to it) or already gone
+            pass
+
+    def put(self, png):
+        """Store chart bytes and return their digest; identical charts are stored once"""
+        digest = hashlib.blake2b(png, digest_size=16).hexdigest()
+        path = self._path(digest)
+        now = time.time()
+        with self._lock:
+            if digest in self._index:
+                self._index[digest] = (len(png), now)
+                self.deduplicated += 1
+                return digest
+
+        # Write under a temporary name so readers never see a partial image
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        for retry in (True, False):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(png)
+                break
+            except FileNotFoundError:
+                # The sweeper removed the shard as it emptied it; create it again
+                if not retry:
+                    raise
+        os.replace(tmp_path, path)
+        with self._lock:
+            if digest not in self._index:
+                self._bytes += len(png)
+            self._index[digest] = (len(png), now)
+        return digest
+
+    def get(self, digest):
+        """Return the bytes of a stored chart, or None if it was never stored or has been swept"""
+        with self._lock:
+            entry = self._index.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._index[digest] = (entry[0], time.time())
+        try:
+            with open(self._path(digest), "rb") as f:
+                png = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                self._forget(digest)
+            return None
+        with self._lock:
+            self.hits += 1
+        return png
+
+    def _forget(self, digest):
+        entry = self._index.pop(digest, None)
+        if entry is not None:
+            self._bytes -= entry[0]
+
+    def sweep(self):
+        """Remove expired charts, then the least recently used ones until under the size cap"""
+        now = time.time()
+        self._sweep_temp_charts(now)
+        with self._lock:
+            by_age = sorted(self._index.items(), key=lambda item: item[1][1])
+            expired = [digest for digest, (_, used) in by_age if now - used > self.ttl]
+            remaining = self._bytes - sum(self._index[digest][0] for digest in expired)
+            for digest, (size, _) in by_age[len(expired):]:
+                if remaining <= self.max_bytes:
+                    break
+                expired.append(digest)
+                remaining -= size
+            for digest in expired:
+                self._forget(digest)
+            self.swept += len(expired)
+
+        for digest in expired:
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+        for shard in {os.path.dirname(self._path(digest)) for digest in expired}:
+            self._remove_shard(shard)
+        if expired:
+            self._notify_swept(set(expired))
+        return len(expired)
+
+    def _sweep_temp_charts(self, now):
+        """Move loose temp charts into the store, so its size cap and TTL cover them too"""
+        try:
+            entries = list(os.scandir(self.root))
+        except OSError:
+            return
+        for entry in entries:
+            if not (entry.name.startswith(TEMP_CHART_PREFIX) and entry.is_file()):
+                continue
+            try:
+                age = now - entry.stat().st_mtime
+                if age < TEMP_CHART_GRACE_SECONDS:
+                    continue
+                if age <= self.ttl:
+                    with open(entry.path, "rb") as f:
+                        self.put(f.read())
+                else:
+                    with self._lock:
+                        self.swept += 1
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return {"charts": len(self._index), "bytes": self._bytes, "hits": self.hits,
+                    "misses": self.misses, "deduplicated": self.deduplicated, "swept": self.swept}
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                pass
+            time.sleep(self.interval)
+
+
+@st.cache_resource
+def get_chart_store():
+    """Return the process-wide chart store (creating its directory and sweeper once)"""
+    return ChartStore()
@@ -0,0 +1,286 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from utils.schema import apply_schema, concat_frames
+
+# Parquet support comes from pyarrow (a streamlit dependency), but keep the
+# cache optional so the loader still works from plain CSV without it
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Bump when the cleaned frame layout changes so old copies get rebuilt
+CACHE_FORMAT_VERSION = 3
+
+# Appended rows are stored as extra part files; past this many parts the
+# copy is rewritten as a single file so reads stay one sequential scan
+MAX_CACHE_PARTS = 8
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def cache_paths(csv_path):
+    """Return the (data, metadata) paths of the columnar copy of a CSV file"""
+    directory, name = os.path.split(os.path.abspath(csv_path))
+    return (os.path.join(directory, f".{name}.parquet"),
+            os.path.join(directory, f".{name}.meta.json"))
+
+
+def _hash_range(f, digest, length):
+    """Feed the next length bytes of f into digest and return the last block read"""
+    block = b""
+    while length > 0:
+        block = f.read(min(_HASH_BLOCK_SIZE, length))
+        if not block:
+            break
+        digest.update(block)
+        length -= len(block)
+    return block
+
+
+def file_digest(path, length=None):
+    """Hash the contents of a file (or its first length bytes) in fixed-size blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    if length is None:
+        length = os.path.getsize(path)
+    with open(path, "rb") as f:
+        _hash_range(f, digest, length)
+    return digest.hexdigest()
+
+
+def source_fingerprint(csv_path):
+    """Describe the current state of the CSV file by size, mtime and content hash"""
+    stat = os.stat(csv_path)
+    return {
+        "format": CACHE_FORMAT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": file_digest(csv_path, stat.st_size),
+    }
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _fresh_meta(csv_path):
+    """Return the metadata of the columnar copy if it still matches the CSV file, else None"""
+    if not PYARROW_AVAILABLE:
+        return None
+
+    data_path, meta_path = cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("format") != CACHE_FORMAT_VERSION or not os.path.exists(data_path):
+        return None
+
+    stat = os.stat(csv_path)
+    if (meta["size"], meta["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+        # Size or mtime moved: the copy is only still valid if the bytes are identical
+        if meta["size"] != stat.st_size or meta["digest"] != file_digest(csv_path):
+            return None
+        meta["mtime_ns"] = stat.st_mtime_ns
+        try:
+            _write_meta(meta_path, meta)
+        except OSError:
+            pass
+    return meta
+
+
+def cached_copy_is_fresh(csv_path):
+    """Check whether the columnar copy of a CSV file can be used as-is"""
+    return _fresh_meta(csv_path) is not None
+
+
+def cached_files(csv_path):
+    """Return the Parquet files making up a fresh columnar copy of a CSV file, or None"""
+    meta = _fresh_meta(csv_path)
+    if meta is None:
+        return None
+    directory = os.path.dirname(cache_paths(csv_path)[0])
+    return [os.path.join(directory, part["file"]) for part in meta["parts"]]
+
+
+def _read_part(data_path, part, meta):
+    path = os.path.join(os.path.dirname(data_path), part["file"])
+    if not part.get("streamed"):
+        # Re-apply the schema so dtypes match a fresh parse of the CSV
+        return apply_schema(pd.read_parquet(path))
+
+    # Streamed parts store labels as plain strings and integers as float64 so every
+    # batch shares one arrow schema; decode labels as dictionaries and re-compact
+    import pyarrow.parquet as pq
+    table = pq.read_table(path, read_dictionary=meta.get("dictionary_columns", []))
+    return apply_schema(table.to_pandas())
+
+
+def _read_parts(data_path, meta):
+    frames = [_read_part(data_path, part, meta) for part in meta["parts"]]
+    return frames[0] if len(frames) == 1 else concat_frames(frames)
+
+
+def read_cached_frame(csv_path):
+    """Return the cached cleaned frame for a CSV file, or None if it is missing or stale"""
+    meta = _fresh_meta(csv_path)
+    if meta is None:
+        return None
+
+    data_path, _ = cache_paths(csv_path)
+    try:
+        return _read_parts(data_path, meta)
+    except Exception:
+        return None
+
+
+def _remove_parts(data_path, meta):
+    """Delete the extra part files listed in an old metadata record"""
+    for part in (meta or {}).get("parts", [])[1:]:
+        try:
+            os.remove(os.path.join(os.path.dirname(data_path), part["file"]))
+        except OSError:
+            pass
+
+
+def _replace_cache(csv_path, write, meta):
+    data_path, meta_path = cache_paths(csv_path)
+    tmp_path = f"{data_path}.tmp"
+    old_meta = _read_meta(meta_path)
+    try:
+        # Drop the old metadata first so a crash mid-write leaves no valid-looking pair,
+        # and write to a temporary file so readers never see a half-written copy
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        _remove_parts(data_path, old_meta)
+        write(tmp_path)
+        os.replace(tmp_path, data_path)
+        meta["parts"] = [{"file": os.path.basename(data_path), "streamed": bool(meta.get("streamed"))}]
+        _write_meta(meta_path, meta)
+        return True
+    except Exception:
+        # A read-only deployment or an unsupported column type just means no cache
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def write_cached_frame(csv_path, df, fingerprint):
+    """Store the cleaned frame next to the CSV file, keyed by the fingerprint taken before parsing"""
+    if not PYARROW_AVAILABLE:
+        return False
+
+    meta = dict(fingerprint, rows=len(df))
+    return _replace_cache(csv_path, lambda path: df.to_parquet(path, index=False), meta)
+
+
+def find_appended_range(csv_path):
+    """If the CSV file only grew since its copy was written, return (meta, fingerprint, start, end)
+
+    start and end are the byte offsets of the new rows. None means the earlier
+    bytes changed (or there is no usable copy) and a full rebuild is needed.
+    """
+    if not PYARROW_AVAILABLE:
+        return None
+
+    data_path, meta_path = cache_paths(csv_path)
+    meta = _read_meta(meta_path)
+    if not meta or meta.get("format") != CACHE_FORMAT_VERSION or "rows" not in meta \
+            or not os.path.exists(data_path):
+        return None
+
+    stat = os.stat(csv_path)
+    start, end = meta["size"], stat.st_size
+    if end <= start or start == 0:
+        return None
+
+    # One pass over the file: verify the already ingested prefix, then extend the
+    # same digest over the new bytes to get the fingerprint of the whole file
+    digest = hashlib.blake2b(digest_size=16)
+    with open(csv_path, "rb") as f:
+        last_block = _hash_range(f, digest, start)
+        # The old copy must end on a complete line, or the "append" rewrote its last row
+        if digest.hexdigest() != meta["digest"] or not last_block.endswith(b"\n"):
+            return None
+        _hash_range(f, digest, end - start)
+
+    fingerprint = {
+        "format": CACHE_FORMAT_VERSION,
+        "size": end,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": digest.hexdigest(),
+    }
+    return meta, fingerprint, start, end
+
+
+def append_cached_part(csv_path, meta, df, fingerprint):
+    """Record rows parsed from the appended bytes as a new part of the columnar copy"""
+    data_path, meta_path = cache_paths(csv_path)
+    new_meta = dict(meta, **fingerprint)
+    new_meta["rows"] = meta["rows"] + len(df)
+
+    if len(meta["parts"]) >= MAX_CACHE_PARTS:
+        # Too many small parts: fold everything back into a single file
+        combined = concat_frames([_read_parts(data_path, meta), df])
+        return write_cached_frame(csv_path, combined, fingerprint)
+
+    part_file = f"{os.path.basename(data_path)}.part{len(meta['parts'])}"
+    part_path = os.path.join(os.path.dirname(data_path), part_file)
+    try:
+        os.remove(meta_path)
+        df.to_parquet(part_path, index=False)
+        new_meta["parts"] = meta["parts"] + [{"file": part_file, "streamed": False}]
+        _write_meta(meta_path, new_meta)
+        return True
+    except Exception:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        return False
+
+
+def _arrow_type(kind):
+    import pyarrow as pa
+    return {
+        "category": pa.string(),
+        "string": pa.string(),
+        # float64 holds every integer a CSV batch can produce, with or without gaps
+        "integer": pa.float64(),
+        "float": pa.float32(),
+        "currency": pa.float64(),
+        "datetime": pa.timestamp("ns"),
+    }[kind]
+
+
+def write_cached_batches(csv_path, batches, fingerprint, column_kinds):
+    """Stream typed batches into the columnar copy without holding the whole frame in memory"""
+    if not PYARROW_AVAILABLE:
+        return False
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, _arrow_type(kind)) for column, kind in column_kinds.items()])
+    meta = dict(fingerprint, rows=0, streamed=True, dictionary_columns=[
+        column for column, kind in column_kinds.items() if kind == "category"])
+
+    def write(path):
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in batches:
+                table = pa.Table.from_pandas(batch, preserve_index=False).cast(schema)
+                writer.write_table(table)
+                meta["rows"] += len(batch)
+
+    return _replace_cache(csv_path, write, meta)
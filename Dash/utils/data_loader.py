@@ -5,55 +5,209 @@ import io
 from PIL import Image
 import matplotlib.pyplot as plt
 import uuid
+import threading
+from utils.file_watcher import FileWatcher
+from utils.chart_memory import session_charts
+from utils.columnar_cache import (read_cached_frame, write_cached_frame, write_cached_batches,
+                                  cached_copy_is_fresh, source_fingerprint, find_appended_range,
+                                  append_cached_part, cached_files, PYARROW_AVAILABLE)
+from utils.schema import detect_schema, csv_read_options, apply_schema
+
+# The loaded dataset is shared read-only between sessions (see load_data), which
+# relies on pandas copy-on-write to keep callers from writing into it (always on
+# from pandas 3, where the option is deprecated)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+DATA_PATH = "data.csv"
+
+# Files at least this large are streamed into the columnar copy in batches
+# instead of being parsed in one go, which bounds peak memory to a few batches
+CHUNKED_INGEST_MIN_BYTES = 256 * 1024 * 1024
+INGEST_CHUNK_ROWS = 200_000
+
+# Dataset versions we already tried to bring the columnar copy up to date for, so
+# a copy that cannot be written (e.g. read-only disk) is not retried every rerun
+_refreshed_versions = set()
+_refresh_lock = threading.Lock()
+
+# (path, version) -> rows the columnar copy had before that version appended to it,
+# so derived structures (e.g. the rollup cube) can update instead of rebuilding
+_append_bases = {}
+
+@st.cache_resource
+def get_dataset_watcher(path):
+    """Return the process-wide watcher that versions changes to a dataset file"""
+    watcher = FileWatcher(path)
+    # Drop only the dataset's own cache entries when it changes; sessions pick up
+    # the new version on their next rerun instead of everyone reloading at once
+    watcher.on_change(lambda changed_path, version: _load_data.clear())
+    return watcher
+
+def dataset_version():
+    """Return the current version number of data.csv"""
+    return get_dataset_watcher(DATA_PATH).version
 
-@st.cache_data
 def load_data():
     """Load data from CSV file and preprocess it"""
+    return load_versioned_data()[1]
+
+def load_versioned_data():
+    """Load the dataset like load_data, returning (version, frame) so callers can key caches on it"""
+    version, state = _prepare_dataset()
+    if state is None:
+        return version, pd.DataFrame()
+
+    # Every caller gets a shallow view of the one shared frame: no data is copied,
+    # and copy-on-write copies a column only if that caller modifies it
+    return version, _load_data(DATA_PATH, version).copy(deep=False)
+
+def load_dataset_files():
+    """Return (version, Parquet files) of the up-to-date columnar copy without loading it
+
+    The file list is None when there is no usable copy yet (e.g. before the
+    first load_data, or without pyarrow).
+    """
+    version, state = _prepare_dataset()
+    if state is None or not PYARROW_AVAILABLE:
+        return version, None
+    return version, cached_files(DATA_PATH)
+
+def _prepare_dataset():
+    """Check the dataset version for this rerun and bring the columnar copy up to date"""
+    version, state = get_dataset_watcher(DATA_PATH).snapshot()
+    if state is None:
+        st.error("Error reading data.csv: file not found")
+        return version, None
+
+    # Let a session know when the data under it changed since its last rerun
+    if st.session_state.get('dataset_version', version) != version:
+        st.toast("data.csv changed - showing the latest data")
+    st.session_state.dataset_version = version
+
+    # Refresh the columnar copy before anything reads it; the lock makes concurrent
+    # sessions wait for one refresh instead of each running their own
+    if PYARROW_AVAILABLE:
+        with _refresh_lock:
+            if (DATA_PATH, version) not in _refreshed_versions:
+                _refreshed_versions.add((DATA_PATH, version))
+                if not cached_copy_is_fresh(DATA_PATH):
+                    refresh_columnar_copy(DATA_PATH, state[0], version)
+
+    return version, state
+
+@st.cache_resource
+def _load_data(path, version):
+    """Load the cleaned frame from its columnar copy, rebuilding it from the CSV if stale
+
+    The frame is shared by all sessions, so it must never be modified in place.
+    """
     try:
-        # Read the CSV file directly
-        df = pd.read_csv("data.csv")
-
-        # Clean up any currency symbols in numeric columns
-        numeric_columns = ['Units Sold', 'Manufacturing Price', 'Sale Price',
-                          'Gross Sales', 'Discounts', 'Sales', 'COGS', 'Profit',
-                          'Month Number', 'Year']
-
-        for col in numeric_columns:
-            if col in df.columns:
-                # Remove currency symbols and commas if present
-                if df[col].dtype == 'object':
-                    df[col] = df[col].astype(str).str.replace(
-                        r'[$,]', '', regex=True)
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-
-        # Convert date column if it exists
-        if 'Date' in df.columns:
-            try:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-                df['Date'] = df['Date'].dt.date
-            except:
-                pass
+        df = read_cached_frame(path)
+        if df is not None:
+            return df
+
+        # Fingerprint before parsing so a write during the parse invalidates the copy
+        fingerprint = source_fingerprint(path)
+        df = read_dataset_csv(path)
+        write_cached_frame(path, df, fingerprint)
 
         return df
     except Exception as e:
         st.error(f"Error reading data.csv: {str(e)}")
         return pd.DataFrame()
 
+def read_dataset_csv(path):
+    """Parse a dataset CSV with the dtypes declared by its registered schema"""
+    # Read only the header first to pick the schema, then parse straight into compact dtypes
+    schema = detect_schema(pd.read_csv(path, nrows=0).columns)
+    df = pd.read_csv(path, **csv_read_options(schema))
+    return apply_schema(df, schema)
+
+def refresh_columnar_copy(path, size, version=None):
+    """Update a stale columnar copy by appending new rows, or by a batched rebuild of large files"""
+    try:
+        # Appends only cost as much as the new rows; anything else is a rebuild
+        base_rows = append_csv_tail(path)
+        if base_rows is not None:
+            _append_bases[(path, version)] = base_rows
+            return
+
+        if size >= CHUNKED_INGEST_MIN_BYTES:
+            # Large files are ingested batch by batch with progress
+            progress_bar = st.progress(0.0, text="Ingesting data.csv...")
+            ingest_csv_chunked(path, progress=lambda done: progress_bar.progress(
+                done, text=f"Ingesting data.csv... {done:.0%}"))
+            progress_bar.empty()
+    except Exception as e:
+        st.error(f"Error ingesting data.csv: {str(e)}")
+
+def appended_base(version):
+    """Return how many rows the dataset had before this version appended to it, or None
+
+    None means the version was not a pure append (or its columnar copy was
+    rebuilt), so anything derived from the previous version must be rebuilt.
+    """
+    return _append_bases.get((DATA_PATH, version))
+
+def append_csv_tail(path):
+    """Parse only the rows appended to a CSV since its columnar copy was written
+
+    Returns the number of rows the copy had before the append, or None if the
+    copy could not be extended.
+    """
+    appended = find_appended_range(path)
+    if appended is None:
+        return None
+    meta, fingerprint, start, end = appended
+
+    columns = pd.read_csv(path, nrows=0).columns
+    schema = detect_schema(columns)
+    with open(path, "rb") as f:
+        f.seek(start)
+        tail = f.read(end - start)
+
+    df = pd.read_csv(io.BytesIO(tail), header=None, names=columns, **csv_read_options(schema))
+    if not append_cached_part(path, meta, apply_schema(df, schema), fingerprint):
+        return None
+    return meta["rows"]
+
+def ingest_csv_chunked(path, chunk_rows=INGEST_CHUNK_ROWS, progress=None):
+    """Stream a dataset CSV into its columnar copy in fixed-size, individually typed batches"""
+    fingerprint = source_fingerprint(path)
+    columns = pd.read_csv(path, nrows=0).columns
+    schema = detect_schema(columns) or {}
+
+    # Columns outside the schema are kept as text so every batch has the same types;
+    # labels also stay text per batch and become categoricals when the copy is read
+    specs = {col: schema.get(col, {"type": "string"}) for col in columns}
+    batch_schema = {col: ({"type": "string"} if spec["type"] == "category" else spec)
+                    for col, spec in specs.items()}
+    total_bytes = max(fingerprint["size"], 1)
+
+    def batches():
+        with open(path, "rb") as f:
+            for chunk in pd.read_csv(f, chunksize=chunk_rows, **csv_read_options(batch_schema)):
+                yield apply_schema(chunk, batch_schema)
+                if progress:
+                    progress(min(f.tell() / total_bytes, 1.0))
+
+    return write_cached_batches(path, batches(), fingerprint,
+                                {col: spec["type"] for col, spec in specs.items()})
+
 # Custom chart function to keep charts in memory
 def in_memory_chart_function(chart):
-    """Store chart in session state and return a reference"""
+    """Store chart in the session's chart store and return a reference"""
     # Generate a unique identifier for the chart
     chart_id = f"chart_{uuid.uuid4()}"
     
     # Convert matplotlib figure to bytes
     buffer = io.BytesIO()
     chart.savefig(buffer, format='png')
-    buffer.seek(0)
+    plt.close(chart)
     
-    # Store in session state
-    if 'memory_images' not in st.session_state:
-        st.session_state.memory_images = {}
-    st.session_state.memory_images[chart_id] = buffer
+    # Store in the session's byte-budgeted chart store (see utils.chart_memory)
+    session_charts()[chart_id] = buffer.getvalue()
     
     # Return reference to the chart
     return chart_id
@@ -63,16 +217,27 @@ def load_data_for_chat():
     try:
         if PANDAS_AI_AVAILABLE:
             import pandasai as pai
-            
-            # Read the data file
-            df = pd.read_csv("data.csv")
-            
+
+            # Reuse this session's SmartDataframe until the dataset changes, so reruns
+            # from the gallery or history don't rebuild it. It is kept per session
+            # because its agent carries conversation memory; the data underneath is
+            # the shared frame from load_data.
+            version = dataset_version()
+            cached = st.session_state.get('chat_dataframe')
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            df = load_data()
+            if df.empty:
+                return None
+
             # Create a SmartDataframe with our custom configuration
             smart_df = pai.SmartDataframe(df, config={"custom_chart_function": in_memory_chart_function})
-            
+            st.session_state.chat_dataframe = (version, smart_df)
+
             return smart_df
         else:
             return None
     except Exception as e:
         st.error(f"Error reading data.csv for chat: {str(e)}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,194 @@
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from utils.exporter import CSV_DATETIME_FORMAT
+from utils.filter_engine import ResultCache
+from utils.schema import detect_schema
+
+# DuckDB is optional: without it the data tab stays on the pandas engine
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# Columns DuckDB adds to each scanned row; ties in a sort are broken on them so
+# paging over tied values (e.g. many rows with one loan_status) is stable
+ROW_ID_COLUMNS = ("filename", "file_row_number")
+
+# Rows per Arrow batch when streaming an export out of DuckDB
+EXPORT_BATCH_ROWS = 100_000
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + text.replace("'", "''") + "'"
+
+
+class SqlSelection:
+    """The rows matched by a set of filters, kept as a WHERE clause instead of row ids
+
+    Behaves like the row-id arrays of the pandas engine where the data tab
+    needs it: len() is the match count and slicing narrows it to a window.
+    """
+
+    def __init__(self, where, params, count, offset=0, limit=None):
+        self.where = where
+        self.params = params
+        self.count = count
+        self.offset = offset
+        self.limit = limit
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, window):
+        start, stop, _ = window.indices(self.count)
+        return SqlSelection(self.where, self.params, max(stop - start, 0),
+                            self.offset + start, max(stop - start, 0))
+
+
+class DuckDBEngine:
+    """Runs the data-tab filters, search, sort and paging as SQL over the columnar copy
+
+    The Parquet files are scanned in place by an embedded, in-process DuckDB
+    (multi-threaded, no server); only counts and the visible page come back
+    into pandas, so the dataset never has to fit in memory.
+    """
+
+    def __init__(self, files, version=None):
+        self.version = version
+        self._con = duckdb.connect()
+        self._lock = threading.Lock()
+        file_list = ", ".join(_literal(path) for path in files)
+        self._con.execute(f"CREATE VIEW scan AS SELECT * FROM read_parquet([{file_list}], union_by_name = true, "
+                          f"filename = true, file_row_number = true)")
+        self._con.execute(f"CREATE VIEW data AS SELECT * EXCLUDE ({', '.join(ROW_ID_COLUMNS)}) FROM scan")
+        self.template = self._query("SELECT * FROM data LIMIT 0")
+        self.n_rows = self._scalar("SELECT count(*) FROM data")
+        self.results = ResultCache()
+
+    def _cursor(self):
+        # A cursor per query lets concurrent sessions share the one database safely
+        with self._lock:
+            return self._con.cursor()
+
+    def _query(self, sql, params=()):
+        return self._cursor().execute(sql, list(params)).df()
+
+    def _scalar(self, sql, params=()):
+        return self._cursor().execute(sql, list(params)).fetchone()[0]
+
+    def _is_datetime(self, column):
+        return pd.api.types.is_datetime64_any_dtype(self.template[column])
+
+    def _conditions(self, categories, ranges, search):
+        """Return a (column, sql, params) triple for each active filter"""
+        conditions = [(column, f"CAST({_quote(column)} AS VARCHAR) = ?", [str(label)])
+                      for column, label in (categories or {}).items()]
+        for column, low, high in ranges or []:
+            if self._is_datetime(column):
+                low, high = pd.Timestamp(low).to_pydatetime(), pd.Timestamp(high).to_pydatetime()
+            conditions.append((column, f"{_quote(column)} BETWEEN ? AND ?", [low, high]))
+        if search and search[0]:
+            term, scope = search
+            columns = list(self.template.columns) if scope == "All columns" else [scope]
+            # Literal, case-insensitive substring match, like the pandas search index
+            sql = " OR ".join(f"contains(lower(CAST({_quote(c)} AS VARCHAR)), ?)" for c in columns)
+            conditions.append((None, f"({sql})", [term.lower()] * len(columns)))
+        return conditions
+
+    @staticmethod
+    def _where(conditions, skip=object()):
+        parts = [(sql, params) for column, sql, params in conditions if column != skip]
+        if not parts:
+            return "TRUE", []
+        return " AND ".join(sql for sql, _ in parts), [p for _, params in parts for p in params]
+
+    def filter_rows(self, categories=None, ranges=None, search=None):
+        """Return the selection matching every filter, with its row count"""
+        where, params = self._where(self._conditions(categories, ranges, search))
+        return SqlSelection(where, params, self._scalar(f"SELECT count(*) FROM data WHERE {where}", params))
+
+    def facet_values(self, column):
+        """Return the sorted labels that occur in a column"""
+        return self.results.get_or_compute(("facet", column), lambda: self._query(
+            f"SELECT DISTINCT CAST({_quote(column)} AS VARCHAR) AS label FROM data "
+            f"WHERE {_quote(column)} IS NOT NULL ORDER BY label")["label"].tolist())
+
+    def bounds(self, column):
+        """Return the (min, max) of a numeric or date column"""
+        def compute():
+            row = self._query(f"SELECT min({_quote(column)}) AS lo, max({_quote(column)}) AS hi FROM data")
+            return row["lo"].iloc[0], row["hi"].iloc[0]
+        return self.results.get_or_compute(("bounds", column), compute)
+
+    def facet_counts(self, columns, categories=None, ranges=None, search=None):
+        """Return {column: {label: rows}}, counting each option under the other filters"""
+        conditions = self._conditions(categories, ranges, search)
+        counts = {}
+        for column in columns:
+            where, params = self._where(conditions, skip=column)
+            result = self._query(
+                f"SELECT CAST({_quote(column)} AS VARCHAR) AS label, count(*) AS n FROM data "
+                f"WHERE {where} AND {_quote(column)} IS NOT NULL GROUP BY label", params)
+            counts[column] = dict(zip(result["label"], result["n"].astype(int)))
+        return counts
+
+    def page(self, rows, columns=None, sort_column=None, ascending=True, offset=0, limit=100):
+        """Fetch one window of the selection, optionally sorted, in the given columns"""
+        select = ", ".join(_quote(c) for c in columns) if columns else f"* EXCLUDE ({', '.join(ROW_ID_COLUMNS)})"
+        order = ""
+        if sort_column is not None:
+            # DuckDB's sort isn't stable and each page is its own query: break ties on the row's position
+            order = (f"ORDER BY {_quote(sort_column)} {'ASC' if ascending else 'DESC'} NULLS LAST, "
+                     f"{', '.join(ROW_ID_COLUMNS)}")
+        return self._query(
+            f"SELECT {select} FROM scan WHERE {rows.where} {order} LIMIT ? OFFSET ?",
+            rows.params + [int(limit), int(rows.offset + offset)])
+
+    def take(self, rows):
+        """Fetch the rows of a selection window"""
+        limit = rows.count if rows.limit is None else rows.limit
+        return self._query(f"SELECT * FROM data WHERE {rows.where} LIMIT ? OFFSET ?",
+                           rows.params + [int(limit), int(rows.offset)])
+
+    def copy_to(self, rows, path, fmt):
+        """Stream the whole selection from DuckDB straight into an export file"""
+        if fmt != "Parquet":
+            # DuckDB's own CSV writer quotes only where needed, like the pandas export
+            compression = "gzip" if fmt == "CSV (gzip)" else "none"
+            self._cursor().execute(
+                f"COPY (SELECT {self._csv_columns()} FROM data WHERE {rows.where}) TO {_literal(path)} "
+                f"(FORMAT csv, HEADER, TIMESTAMPFORMAT {_literal(CSV_DATETIME_FORMAT)}, "
+                f"COMPRESSION {compression})", rows.params)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        reader = self._cursor().execute(
+            f"SELECT * FROM data WHERE {rows.where}", rows.params).fetch_record_batch(EXPORT_BATCH_ROWS)
+        with pq.ParquetWriter(path, reader.schema) as writer:
+            for batch in reader:
+                writer.write_table(pa.Table.from_batches([batch]))
+
+    def _csv_columns(self):
+        """Select list writing integer columns as integers (streamed parts store them as doubles)"""
+        schema = detect_schema(self.template.columns) or {}
+        return ", ".join(
+            f"CAST({_quote(column)} AS BIGINT) AS {_quote(column)}"
+            if schema.get(column, {}).get("type") == "integer"
+            and pd.api.types.is_float_dtype(self.template[column]) else _quote(column)
+            for column in self.template.columns)
+
+
+@st.cache_resource(max_entries=2)
+def get_duckdb_engine(version, files):
+    """Return the DuckDB engine shared by all sessions for this dataset version"""
+    return DuckDBEngine(list(files), version)
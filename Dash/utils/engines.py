@@ -0,0 +1,33 @@
+import os
+
+from utils.data_loader import DATA_PATH, load_versioned_data, load_dataset_files
+from utils.filter_engine import get_filter_engine
+from utils.duckdb_engine import DUCKDB_AVAILABLE, get_duckdb_engine
+from utils.polars_engine import POLARS_AVAILABLE, get_polars_engine
+
+# Which engine evaluates the data tab: "pandas" (default, in memory), "duckdb"
+# (SQL over the columnar copy, for data larger than memory) or "polars" (lazy,
+# multi-threaded scans of the columnar copy or the CSV)
+DATA_ENGINE = os.environ.get("DASH_DATA_ENGINE", "pandas").lower()
+
+
+def get_table_engine():
+    """Return the data-tab engine for the current dataset version, or None if there is no data"""
+    if DATA_ENGINE == "duckdb" and DUCKDB_AVAILABLE:
+        version, files = load_dataset_files()
+        if files:
+            return get_duckdb_engine(version, tuple(files))
+
+    if DATA_ENGINE == "polars" and POLARS_AVAILABLE:
+        version, files = load_dataset_files()
+        # Scan the columnar copy when there is one, the CSV itself otherwise
+        sources = files or ([DATA_PATH] if os.path.exists(DATA_PATH) else None)
+        if sources is None:
+            return None
+        return get_polars_engine(version, tuple(sources))
+
+    # The pandas engine (also the fallback until a columnar copy exists)
+    version, df = load_versioned_data()
+    if df.empty:
+        return None
+    return get_filter_engine(df, version)
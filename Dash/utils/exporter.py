@@ -0,0 +1,136 @@
+import gzip
+import os
+import threading
+import uuid
+
+# Where prepared exports are kept, and how many of them to keep around
+EXPORT_DIR = os.path.join("exports", "data")
+MAX_CACHED_EXPORTS = 8
+
+# Rows converted per step, so an export never holds more than one chunk as text
+EXPORT_CHUNK_ROWS = 100_000
+
+# Every engine writes timestamps in CSV exports with this one format, whatever
+# the column's resolution or whether a chunk happens to hold only midnights
+CSV_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+EXPORT_FORMATS = {
+    "CSV": {"extension": "csv", "mime": "text/csv"},
+    "CSV (gzip)": {"extension": "csv.gz", "mime": "application/gzip"},
+    "Parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+
+def _chunks(engine, rows):
+    for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+        yield engine.take(rows[start:start + EXPORT_CHUNK_ROWS])
+
+
+def _write_csv(f, engine, rows):
+    header = True
+    for chunk in _chunks(engine, rows):
+        chunk.to_csv(f, header=header, index=False, date_format=CSV_DATETIME_FORMAT)
+        header = False
+    if header:
+        # No rows selected: still write the column names
+        engine.template.to_csv(f, index=False)
+
+
+def _write_parquet(path, engine, rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(engine.template, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(engine, rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# Exports are named after the dataset version, a counter that starts again with
+# every server process, so files left by an earlier process are never reused
+_stale_exports_cleared = False
+_clear_lock = threading.Lock()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _clear_stale_exports():
+    """Delete the prepared exports of earlier server processes, once per process"""
+    global _stale_exports_cleared
+    with _clear_lock:
+        if _stale_exports_cleared:
+            return
+        _stale_exports_cleared = True
+        try:
+            names = os.listdir(EXPORT_DIR)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".tmp"):
+                _remove(os.path.join(EXPORT_DIR, name))
+
+
+def _prune_exports(keep):
+    """Delete all but the most recently used prepared exports"""
+    try:
+        names = os.listdir(EXPORT_DIR)
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        if name.endswith(".tmp"):
+            continue
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            # Removed by another session since it was listed
+            continue
+    for _, path in sorted(entries, reverse=True)[keep:]:
+        _remove(path)
+
+
+def prepare_export(engine, rows, fmt, state_key):
+    """Write the selected rows to a file in the given format and return its path
+
+    Files are named after the filter state key, so asking again for the same
+    filters and format reuses the earlier file instead of exporting again.
+    """
+    _clear_stale_exports()
+    extension = EXPORT_FORMATS[fmt]["extension"]
+    path = os.path.join(EXPORT_DIR, f"filtered_data_{state_key}.{extension}")
+    try:
+        # Mark it recently used; fails if it doesn't exist or another session just pruned it
+        os.utime(path)
+        return path
+    except OSError:
+        pass
+
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    # Unique temporary name so two sessions exporting the same filters don't collide
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        # Stream chunk by chunk into a temporary file, then move it into place
+        if hasattr(engine, "copy_to"):
+            # Query engines can stream the selection out themselves
+            engine.copy_to(rows, tmp_path, fmt)
+        elif fmt == "CSV":
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                _write_csv(f, engine, rows)
+        elif fmt == "CSV (gzip)":
+            with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+                _write_csv(f, engine, rows)
+        else:
+            _write_parquet(tmp_path, engine, rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    _prune_exports(MAX_CACHED_EXPORTS)
+    return path
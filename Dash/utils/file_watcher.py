@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+
+# How often the background thread looks at the watched file
+POLL_INTERVAL_SECONDS = 2.0
+
+
+class FileWatcher:
+    """Poll a file's size and mtime in a background thread and version its changes"""
+
+    def __init__(self, path, interval=POLL_INTERVAL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._state = self._stat()
+        self._version = 0
+        self._callbacks = []
+        self._thread = threading.Thread(target=self._run, name=f"watch:{path}", daemon=True)
+        self._thread.start()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def snapshot(self):
+        """Return (version, (size, mtime_ns)) as of the last poll; the state is None if the file is missing"""
+        with self._lock:
+            return self._version, self._state
+
+    @property
+    def version(self):
+        with self._lock:
+            return self._version
+
+    def on_change(self, callback):
+        """Call callback(path, version) from the watcher thread after every version bump"""
+        self._callbacks.append(callback)
+
+    def _run(self):
+        pending = None
+        while True:
+            time.sleep(self.interval)
+            state = self._stat()
+            with self._lock:
+                unchanged = state == self._state
+            if unchanged:
+                pending = None
+                continue
+
+            # Only bump once the file has held still for a full interval, so a writer
+            # appending in several steps produces one new version instead of many
+            if state != pending:
+                pending = state
+                continue
+
+            with self._lock:
+                self._state = state
+                self._version += 1
+                version = self._version
+            pending = None
+
+            for callback in list(self._callbacks):
+                try:
+                    callback(self.path, version)
+                except Exception:
+                    pass
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.search_index import get_search_index
+
+# Below this share of selected rows a range is applied by scattering its row ids
+# from the sorted index; above it a straight vectorized comparison is cheaper
+_SCATTER_MAX_FRACTION = 0.125
+
+# Memory budget for memoized filter results, per dataset version
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def _result_size(value):
+    """Rough number of bytes a cached result keeps alive"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, dict):
+        return 64 + sum(64 + _result_size(item) for item in value.values())
+    return 64
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the total size of its values, with hit/miss counters"""
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries to stay within budget"""
+        size = _result_size(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+                # Evict least recently used results until back under budget
+                while self._bytes > self.max_bytes:
+                    _, (_, evicted_size) = self._entries.popitem(last=False)
+                    self._bytes -= evicted_size
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+class FilterEngine:
+    """Column indexes over one dataset version for evaluating data-tab filters in a single pass
+
+    Categorical columns are reduced to integer code arrays and numeric or date
+    columns to sorted value arrays. Both are built lazily the first time a
+    filter touches the column and then reused for every later evaluation, as
+    are the facet catalog (distinct options and bounds) derived from them.
+    """
+
+    def __init__(self, df, version=None):
+        self.df = df
+        self.version = version
+        self.n_rows = len(df)
+        # An empty frame with the dataset's columns and dtypes, for building the UI
+        self.template = df.head(0)
+        self._codes = {}
+        self._ranges = {}
+        self._facets = {}
+        self._bounds = {}
+        self._orders = {}
+        # Row ids and facet counts of recent filter states, keyed by filter_state_key
+        self.results = ResultCache()
+
+    def _code_index(self, column):
+        """Return (codes, {label: [codes]}, n_codes) where labels are the str() forms shown in the UI"""
+        if column not in self._codes:
+            series = self.df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                categories = series.cat.categories
+            else:
+                codes, categories = pd.factorize(series)
+            labels = {}
+            for code, value in enumerate(categories):
+                labels.setdefault(str(value), []).append(code)
+            self._codes[column] = (codes, labels, len(categories))
+        return self._codes[column]
+
+    def _range_index(self, column):
+        """Return (values, order, sorted_values) for a numeric or datetime column"""
+        if column not in self._ranges:
+            series = self.df[column]
+            if pd.api.types.is_datetime64_any_dtype(series):
+                # Compare datetimes as int64 nanoseconds; NaT sorts first and never matches
+                values = series.to_numpy(dtype="datetime64[ns]").view("i8")
+            else:
+                values = series.to_numpy()
+                if values.dtype == object:
+                    values = series.to_numpy(dtype="float64", na_value=np.nan)
+            # NaN sorts last, so searchsorted on the bounds never selects it
+            order = np.argsort(values, kind="stable")
+            self._ranges[column] = (values, order, values[order])
+        return self._ranges[column]
+
+    def _bound(self, column, value):
+        if pd.api.types.is_datetime64_any_dtype(self.df[column]):
+            return pd.Timestamp(value).value
+        return value
+
+    def _category_mask(self, column, label):
+        codes, labels, _ = self._code_index(column)
+        selected = labels.get(str(label))
+        if not selected:
+            return np.zeros(self.n_rows, dtype=bool)
+        if len(selected) == 1:
+            return codes == selected[0]
+        return np.isin(codes, selected)
+
+    def _range_mask(self, column, low, high):
+        """Return the rows within [low, high], or None if the range covers every row"""
+        values, order, sorted_values = self._range_index(column)
+        low, high = self._bound(column, low), self._bound(column, high)
+        start = np.searchsorted(sorted_values, low, side="left")
+        stop = np.searchsorted(sorted_values, high, side="right")
+
+        if start == 0 and stop == self.n_rows:
+            return None
+        if stop - start <= self.n_rows * _SCATTER_MAX_FRACTION:
+            in_range = np.zeros(self.n_rows, dtype=bool)
+            in_range[order[start:stop]] = True
+            return in_range
+        return (values >= low) & (values <= high)
+
+    def search_mask(self, term, scope="All columns"):
+        """Return the rows where the term occurs (in one column, or in any), ignoring case"""
+        columns = None if scope == "All columns" else [scope]
+        return self.results.get_or_compute(
+            ("search", term.lower(), scope),
+            lambda: get_search_index(self.df, self.version).match_mask(term, columns))
+
+    def _masks(self, categories, ranges, search=None):
+        """Return a (column, mask) pair for every filter that actually removes rows"""
+        masks = [(column, self._category_mask(column, label))
+                 for column, label in (categories or {}).items()]
+        for column, low, high in ranges or []:
+            mask = self._range_mask(column, low, high)
+            if mask is not None:
+                masks.append((column, mask))
+        if search and search[0]:
+            masks.append((None, self.search_mask(*search)))
+        return masks
+
+    def filter_rows(self, categories=None, ranges=None, search=None):
+        """Return the positions of rows matching every filter
+
+        categories maps a column to the label selected for it; ranges is a list
+        of (column, low, high) tuples with inclusive bounds; search is an
+        optional (term, scope) pair from the search box.
+        """
+        mask = np.ones(self.n_rows, dtype=bool)
+        for _, column_mask in self._masks(categories, ranges, search):
+            mask &= column_mask
+        rows = np.flatnonzero(mask)
+        # Results are memoized and shared between sessions, so nobody may modify them
+        rows.flags.writeable = False
+        return rows
+
+    def facet_values(self, column):
+        """Return the sorted labels that occur in a column, i.e. its selectbox options"""
+        if column not in self._facets:
+            codes, labels, n_codes = self._code_index(column)
+            present = np.bincount(codes[codes >= 0], minlength=n_codes) > 0
+            self._facets[column] = sorted(label for label, ids in labels.items() if present[ids].any())
+        return self._facets[column]
+
+    def bounds(self, column):
+        """Return the (min, max) of a numeric or date column, ignoring missing values"""
+        if column not in self._bounds:
+            series = self.df[column]
+            self._bounds[column] = (series.min(), series.max())
+        return self._bounds[column]
+
+    def facet_counts(self, columns, categories=None, ranges=None, search=None):
+        """Return {column: {label: rows}} for each facet column
+
+        Each option is counted under all the *other* active filters, i.e. the
+        number of rows the table would show if that option were selected.
+        """
+        masks = self._masks(categories, ranges, search)
+        counts = {}
+        for column in columns:
+            mask = np.ones(self.n_rows, dtype=bool)
+            for key, other_mask in masks:
+                if key != column:
+                    mask &= other_mask
+            codes, labels, n_codes = self._code_index(column)
+            selected = codes[mask]
+            per_code = np.bincount(selected[selected >= 0], minlength=n_codes)
+            counts[column] = {label: int(per_code[ids].sum()) for label, ids in labels.items()}
+        return counts
+
+    def sort_order(self, column, ascending=True):
+        """Return every row position ordered by a column, with missing values last"""
+        key = (column, ascending)
+        if key not in self._orders:
+            # A positional index makes the sorted index labels the row positions
+            series = self.df[column].reset_index(drop=True)
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Order labels by their text, like the query engines, whatever the category order
+                series = series.cat.reorder_categories(sorted(series.cat.categories, key=str))
+            # A stable sort in either direction keeps tied rows in file order, as the
+            # DuckDB and Polars engines do, so pages match across engines
+            order = series.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+            self._orders[key] = order
+        return self._orders[key]
+
+    def page(self, rows, columns=None, sort_column=None, ascending=True, offset=0, limit=100):
+        """Materialize one window of the selected rows, optionally sorted, in the given columns
+
+        Only the rows in the window are copied, whatever the size of the selection.
+        """
+        if sort_column is not None:
+            # Walk the precomputed sort order and keep the selected rows, instead of sorting them
+            selected = np.zeros(self.n_rows, dtype=bool)
+            selected[rows] = True
+            order = self.sort_order(sort_column, ascending)
+            rows = order[selected[order]]
+        frame = self.df if columns is None else self.df[columns]
+        return frame.take(rows[offset:offset + limit])
+
+    def take(self, rows):
+        """Materialize the selected rows with one positional take"""
+        if len(rows) == self.n_rows:
+            return self.df
+        return self.df.take(rows)
+
+
+def filter_state_key(version, categories=None, ranges=None, search=None):
+    """Return a stable hash identifying a dataset version plus a set of filters
+
+    Filters that select the same rows in a different order (or with the same
+    bounds written as int vs float) produce the same key.
+    """
+    state = {
+        "version": version,
+        "categories": sorted((column, str(label)) for column, label in (categories or {}).items()),
+        "ranges": sorted((column, _canonical(low), _canonical(high)) for column, low, high in ranges or []),
+        "search": list(search) if search and search[0] else None,
+    }
+    return hashlib.blake2b(json.dumps(state, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    return str(pd.Timestamp(value))
+
+
+@st.cache_resource(max_entries=2)
+def _engine_for_version(version, _df):
+    return FilterEngine(_df, version)
+
+
+def get_filter_engine(df, version):
+    """Return the filter engine shared by all sessions for this dataset version"""
+    return _engine_for_version(version, df)
@@ -0,0 +1,161 @@
+import streamlit as st
+
+from utils.data_loader import load_versioned_data
+from utils.rollup import PERIOD, get_rollup_cube, scan_totals
+from utils.schema import detect_dataset
+
+# KPI tiles per dataset and page section. Each tile is answered from the rollup
+# cube with one of these stats:
+#   "rows"  - number of rows in the slice
+#   "sum"   - total of a measure
+#   "mean"  - average of a measure over its non-missing values
+#   "share" - fraction of all rows that fall in the slice given by "filters"
+#   "rate"  - fraction of rows where a measure is present (e.g. past-due loans)
+#   "ratio" - sum of a measure divided by the sum of the "over" measure
+# "format" is one of "currency", "count", "percent" or "number"; tiles where a
+# lower value is the good direction set "higher_is_better": False.
+DATASET_KPIS = {
+    "loan": {
+        "home": [
+            {"label": "Total Principal", "stat": "sum", "measure": "Principal", "format": "currency"},
+            {"label": "Loans", "stat": "rows", "format": "count"},
+            {"label": "Paid Off", "stat": "share", "filters": {"loan_status": "PAIDOFF"},
+             "format": "percent"},
+            {"label": "Past-due Rate", "stat": "rate", "measure": "past_due_days", "format": "percent",
+             "higher_is_better": False},
+        ],
+        "finance": [
+            {"label": "Average Loan", "stat": "mean", "measure": "Principal", "format": "currency"},
+            {"label": "Principal in Collection", "stat": "sum", "measure": "Principal",
+             "filters": {"loan_status": "COLLECTION"}, "format": "currency", "higher_is_better": False},
+            {"label": "Recovered from Collection", "stat": "sum", "measure": "Principal",
+             "filters": {"loan_status": "COLLECTION_PAIDOFF"}, "format": "currency"},
+        ],
+        "project": [
+            {"label": "Average Term (days)", "stat": "mean", "measure": "terms", "format": "number"},
+            {"label": "Average Days Past Due", "stat": "mean", "measure": "past_due_days", "format": "number",
+             "higher_is_better": False},
+            {"label": "Average Borrower Age", "stat": "mean", "measure": "age", "format": "number"},
+        ],
+    },
+    "sales": {
+        "home": [
+            {"label": "Total Sales", "stat": "sum", "measure": "Sales", "format": "currency"},
+            {"label": "Total Profit", "stat": "sum", "measure": "Profit", "format": "currency"},
+            {"label": "Units Sold", "stat": "sum", "measure": "Units Sold", "format": "count"},
+            {"label": "Profit Margin", "stat": "ratio", "measure": "Profit", "over": "Sales",
+             "format": "percent"},
+        ],
+        "finance": [
+            {"label": "Gross Sales", "stat": "sum", "measure": "Gross Sales", "format": "currency"},
+            {"label": "Discounts", "stat": "sum", "measure": "Discounts", "format": "currency",
+             "higher_is_better": False},
+            {"label": "COGS", "stat": "sum", "measure": "COGS", "format": "currency",
+             "higher_is_better": False},
+        ],
+        "project": [
+            {"label": "Transactions", "stat": "rows", "format": "count"},
+            {"label": "Average Sale Price", "stat": "mean", "measure": "Sale Price", "format": "currency"},
+            {"label": "Average Units per Sale", "stat": "mean", "measure": "Units Sold", "format": "number"},
+        ],
+    },
+}
+
+
+def _totals(cube, df, filters):
+    """Return the totals of a slice from the cube, or from a scan of the frame"""
+    try:
+        return cube.totals(filters)
+    except KeyError:
+        # A filter on a column the cube doesn't keep (e.g. dropped to stay dense): scan the frame
+        return scan_totals(df, filters, cube)
+
+
+def _stat(cube, df, tile, filters=None):
+    """Evaluate one tile's stat on a slice of the cube, or None if the slice is empty"""
+    filters = dict(filters or {})
+    totals = _totals(cube, df, dict(filters, **tile.get("filters", {})))
+    stat, measure = tile["stat"], tile.get("measure")
+    if stat == "rows":
+        return totals["rows"]
+    if stat == "sum":
+        return totals[measure]
+    if stat == "mean":
+        return totals[measure] / totals[f"{measure}_count"] if totals[f"{measure}_count"] else None
+    if stat == "share":
+        rows = _totals(cube, df, filters)["rows"]
+        return totals["rows"] / rows if rows else None
+    if stat == "rate":
+        return totals[f"{measure}_count"] / totals["rows"] if totals["rows"] else None
+    if stat == "ratio":
+        return totals[measure] / totals[tile["over"]] if totals[tile["over"]] else None
+    raise ValueError(f"Unknown KPI stat: {stat}")
+
+
+def format_value(value, fmt):
+    """Format a KPI value for display"""
+    if value is None:
+        return "–"
+    if fmt == "currency":
+        return f"${value:,.0f}"
+    if fmt == "count":
+        return f"{value:,.0f}"
+    if fmt == "percent":
+        return f"{value:.1%}"
+    return f"{value:,.1f}"
+
+
+def _delta(current, previous, fmt):
+    """Return the period-over-period change as (text, direction), direction being +1, -1 or 0"""
+    if current is None or previous is None:
+        return None, 0
+    direction = (current > previous) - (current < previous)
+    if fmt == "percent":
+        return f"{(current - previous) * 100:+.1f} pts", direction
+    if not previous:
+        return None, direction
+    return f"{(current - previous) / abs(previous):+.1%}", direction
+
+
+def compute_kpis(cube, df, tiles):
+    """Evaluate KPI tiles on a cube, with the change between its last two periods
+
+    Values cover the whole dataset; deltas compare the tile's stat over the
+    latest period with the one before it (periods as bucketed by the cube).
+    Slices the cube can't answer are scanned from df.
+    """
+    periods = cube.periods()
+    latest, previous = (periods[-1], periods[-2]) if len(periods) >= 2 else (None, None)
+    results = []
+    for tile in tiles:
+        fmt = tile.get("format", "number")
+        result = {"label": tile["label"], "value": format_value(_stat(cube, df, tile), fmt),
+                  "delta": None, "good": None, "comparison": None}
+        if latest is not None:
+            result["delta"], direction = _delta(_stat(cube, df, tile, {PERIOD: latest}),
+                                                _stat(cube, df, tile, {PERIOD: previous}), fmt)
+            if direction:
+                result["good"] = (direction > 0) == tile.get("higher_is_better", True)
+            result["comparison"] = f"{latest} vs {previous}"
+        results.append(result)
+    return results
+
+
+@st.cache_data(max_entries=16)
+def _kpis_for_version(version, section, _df):
+    tiles = DATASET_KPIS.get(detect_dataset(_df.columns), {}).get(section, [])
+    if not tiles:
+        return []
+    return compute_kpis(get_rollup_cube(_df, version), _df, tiles)
+
+
+def get_kpis(section):
+    """Return the KPI tiles of a page section ("home", "finance" or "project") for the current data
+
+    Tiles are computed from the shared rollup cube, which is extended rather
+    than rebuilt when rows are appended, and cached per dataset version.
+    """
+    version, df = load_versioned_data()
+    if df.empty:
+        return []
+    return _kpis_for_version(version, section, df)
@@ -1,5 +1,7 @@
 import streamlit as st
 
+from utils.chart_store import get_chart_store
+
 def setup_page_config():
     """Set up the page configuration"""
     st.set_page_config(layout="wide")
@@ -14,10 +16,18 @@ def init_session_state():
     # Chat history for the chat tab only
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
-    
-    # Ensure exports directory exists for image outputs
-    import os
-    os.makedirs("exports/charts", exist_ok=True)
+    # Create the chart directory (PandasAI saves its charts there) and start its sweeper
+    get_chart_store()
+
+def keep_widget_state(prefixes):
+    """Keep the state of widgets whose keys start with one of the prefixes across reruns
+
+    Streamlit forgets a widget's value in any run that doesn't render it, e.g.
+    while another section is shown; writing the value back each run keeps it.
+    """
+    for key in list(st.session_state.keys()):
+        if isinstance(key, str) and key.startswith(prefixes):
+            st.session_state[key] = st.session_state[key]
 
 def apply_custom_css():
     """Apply custom CSS styles to the application"""
@@ -105,5 +115,26 @@ def apply_custom_css():
             box-shadow: 0 1px 3px rgba(0,0,0,0.1);
             margin: 10px 0;
         }
+        /* Section navigation: a radio group drawn as a row of tabs */
+        .st-key-section_nav div[role="radiogroup"] {
+            gap: 0;
+            border-bottom: 1px solid #E5E7EB;
+        }
+        
+        .st-key-section_nav div[role="radiogroup"] > label {
+            margin: 0;
+            padding: 0.5rem 1rem;
+            border-bottom: 2px solid transparent;
+            cursor: pointer;
+        }
+        
+        .st-key-section_nav div[role="radiogroup"] > label > div:first-child {
+            display: none;
+        }
+        
+        .st-key-section_nav div[role="radiogroup"] > label:has(input:checked) {
+            border-bottom-color: #FF4B4B;
+            color: #FF4B4B;
+        }
         </style>
     """, unsafe_allow_html=True)
\ No newline at end of file
@@ -6,23 +6,20 @@ import matplotlib.pyplot as plt
 import os
 import uuid
 
-# Initialize session state for storing images
-if 'memory_images' not in st.session_state:
-    st.session_state.memory_images = {}
+from utils.chart_memory import session_charts
 
 # Custom chart handling function that prevents popups
 def custom_chart_function(chart):
-    """Store chart in session state and prevent direct display"""
+    """Store chart in the session's chart store and prevent direct display"""
     # Generate a unique identifier for the chart
     chart_id = f"chart_{uuid.uuid4()}"
     
     # Convert matplotlib figure to bytes
     buffer = io.BytesIO()
     chart.savefig(buffer, format='png')
-    buffer.seek(0)
     
-    # Store in session state
-    st.session_state.memory_images[chart_id] = buffer
+    # Store in the session's byte-budgeted chart store
+    session_charts()[chart_id] = buffer.getvalue()
     
     # Important: Close the figure to prevent display
     plt.close(chart)
@@ -32,15 +29,15 @@ def custom_chart_function(chart):
 
 # Helper function to display image from memory
 def display_in_memory_image(chart_id):
-    if chart_id in st.session_state.memory_images:
-        image_bytes = st.session_state.memory_images[chart_id]
-        # Reset buffer position
-        image_bytes.seek(0)
-        # Open and display the image
-        image = Image.open(image_bytes)
-        st.image(image)
-        return True
-    return False
+    # Charts evicted from memory are reloaded from the spill directory
+    image_bytes = session_charts().get(chart_id)
+    if image_bytes is None:
+        st.info("This chart is no longer available.")
+        return False
+    # Open and display the image
+    image = Image.open(io.BytesIO(image_bytes))
+    st.image(image)
+    return True
 
 # Initialize PandasAI with OpenAI integration if available
 try:
@@ -0,0 +1,209 @@
+import gzip
+import os
+import shutil
+
+import pandas as pd
+import streamlit as st
+
+from utils.exporter import CSV_DATETIME_FORMAT
+from utils.filter_engine import ResultCache
+from utils.schema import detect_schema
+
+# Polars is optional: without it the data tab stays on the pandas engine
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+
+def _typed_column(column, spec):
+    """Return the expression converting a raw text CSV column to its schema type"""
+    kind = spec["type"]
+    col = pl.col(column)
+    if kind == "category":
+        return col.cast(pl.Categorical)
+    if kind == "integer":
+        return col.cast(pl.Int64, strict=False)
+    if kind == "float":
+        return col.cast(pl.Float32, strict=False)
+    if kind == "currency":
+        return col.str.replace_all(r"[\s$,]", "").cast(pl.Float64, strict=False)
+    if kind == "datetime":
+        return col.str.strptime(pl.Datetime("ns"), spec.get("format"), strict=False)
+    return col
+
+
+def scan_dataset(sources):
+    """Return a LazyFrame over the columnar copy's Parquet files, or over the CSV itself
+
+    CSV columns are read as text and converted with the same registered schema
+    as the pandas loader, inside the lazy plan so filters still push down.
+    Parquet parts are scanned one by one: the streamed base part and appended
+    parts store the same columns with different types (e.g. strings against
+    dictionary categoricals, float64 against downcast integers), so they are
+    combined on their common supertypes rather than one shared schema.
+    """
+    if not sources[0].endswith(".csv"):
+        parts = [_plain_labels(pl.scan_parquet(source)) for source in sources]
+        return parts[0] if len(parts) == 1 else pl.concat(parts, how="diagonal_relaxed")
+
+    frame = pl.scan_csv(sources[0], infer_schema_length=0)
+    columns = frame.collect_schema().names()
+    schema = detect_schema(columns) or {}
+    return frame.with_columns([_typed_column(column, spec) for column, spec in schema.items()
+                               if column in columns])
+
+
+def _plain_labels(frame):
+    """Cast categorical columns of a Parquet part to strings, which every part can be combined on"""
+    return frame.with_columns([pl.col(column).cast(pl.Utf8)
+                               for column, dtype in frame.collect_schema().items()
+                               if dtype == pl.Categorical])
+
+
+class LazySelection:
+    """The rows matched by a set of filters, kept as a Polars predicate instead of row ids
+
+    Behaves like the row-id arrays of the pandas engine where the data tab
+    needs it: len() is the match count and slicing narrows it to a window.
+    """
+
+    def __init__(self, predicate, count, offset=0, limit=None):
+        self.predicate = predicate
+        self.count = count
+        self.offset = offset
+        self.limit = limit
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, window):
+        start, stop, _ = window.indices(self.count)
+        return LazySelection(self.predicate, max(stop - start, 0),
+                             self.offset + start, max(stop - start, 0))
+
+
+class PolarsEngine:
+    """Runs the data-tab filters, search, sort and paging as lazy Polars queries
+
+    Every query is planned over the scan, so filters are pushed down into the
+    Parquet or CSV reader, only the columns a query uses are read, and the
+    work runs on all cores. Only counts and the visible page are converted
+    to pandas.
+    """
+
+    def __init__(self, sources, version=None):
+        self.version = version
+        self.frame = scan_dataset(sources)
+        self.template = self.frame.head(0).collect().to_pandas()
+        self.n_rows = self.frame.select(pl.len()).collect().item()
+        self.results = ResultCache()
+
+    def _conditions(self, categories, ranges, search):
+        """Return a (column, predicate) pair for each active filter"""
+        conditions = [(column, pl.col(column).cast(pl.Utf8) == str(label))
+                      for column, label in (categories or {}).items()]
+        for column, low, high in ranges or []:
+            conditions.append((column, pl.col(column).is_between(low, high)))
+        if search and search[0]:
+            term, scope = search
+            columns = list(self.template.columns) if scope == "All columns" else [scope]
+            # Literal, case-insensitive substring match, like the pandas search index
+            conditions.append((None, pl.any_horizontal([
+                pl.col(c).cast(pl.Utf8).str.to_lowercase().str.contains(term.lower(), literal=True)
+                .fill_null(False) for c in columns])))
+        return conditions
+
+    @staticmethod
+    def _predicate(conditions, skip=object()):
+        predicates = [predicate for column, predicate in conditions if column != skip]
+        return pl.all_horizontal(predicates) if predicates else pl.lit(True)
+
+    def filter_rows(self, categories=None, ranges=None, search=None):
+        """Return the selection matching every filter, with its row count"""
+        predicate = self._predicate(self._conditions(categories, ranges, search))
+        return LazySelection(predicate, self.frame.filter(predicate).select(pl.len()).collect().item())
+
+    def facet_values(self, column):
+        """Return the sorted labels that occur in a column"""
+        return self.results.get_or_compute(("facet", column), lambda: (
+            self.frame.select(pl.col(column).cast(pl.Utf8).drop_nulls().unique().sort())
+            .collect().to_series().to_list()))
+
+    def bounds(self, column):
+        """Return the (min, max) of a numeric or date column"""
+        return self.results.get_or_compute(("bounds", column), lambda: (
+            self.frame.select(pl.col(column).min().alias("lo"), pl.col(column).max().alias("hi"))
+            .collect().row(0)))
+
+    def facet_counts(self, columns, categories=None, ranges=None, search=None):
+        """Return {column: {label: rows}}, counting each option under the other filters"""
+        conditions = self._conditions(categories, ranges, search)
+        queries = [
+            self.frame.filter(self._predicate(conditions, skip=column))
+            .select(pl.col(column).cast(pl.Utf8).alias("label"))
+            .drop_nulls()
+            .group_by("label")
+            .agg(pl.len().alias("n"))
+            for column in columns
+        ]
+        # One call runs every column's count in parallel
+        counts = {}
+        for column, result in zip(columns, pl.collect_all(queries)):
+            counts[column] = dict(zip(result["label"].to_list(), result["n"].to_list()))
+        return counts
+
+    def _window(self, rows, sort_column=None, ascending=True):
+        frame = self.frame.filter(rows.predicate)
+        if sort_column is not None:
+            frame = frame.sort(sort_column, descending=not ascending, nulls_last=True,
+                               maintain_order=True)
+        return frame
+
+    def page(self, rows, columns=None, sort_column=None, ascending=True, offset=0, limit=100):
+        """Fetch one window of the selection, optionally sorted, in the given columns"""
+        frame = self._window(rows, sort_column, ascending)
+        if columns:
+            frame = frame.select(columns)
+        return frame.slice(rows.offset + offset, limit).collect().to_pandas()
+
+    def take(self, rows):
+        """Fetch the rows of a selection window"""
+        limit = rows.count if rows.limit is None else rows.limit
+        return self._window(rows).slice(rows.offset, limit).collect().to_pandas()
+
+    def copy_to(self, rows, path, fmt):
+        """Stream the whole selection from the scan straight into an export file"""
+        frame = self._window(rows)
+        if fmt == "Parquet":
+            frame.sink_parquet(path)
+            return
+
+        frame = frame.with_columns(self._csv_integers())
+        if fmt == "CSV":
+            frame.sink_csv(path, datetime_format=CSV_DATETIME_FORMAT)
+        else:
+            # Polars can't stream into gzip: sink the CSV in one pass, then compress it
+            csv_path = f"{path}.csv.tmp"
+            try:
+                frame.sink_csv(csv_path, datetime_format=CSV_DATETIME_FORMAT)
+                with open(csv_path, "rb") as src, gzip.open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            finally:
+                if os.path.exists(csv_path):
+                    os.remove(csv_path)
+
+
+    def _csv_integers(self):
+        """Casts writing integer columns as integers (streamed parts store them as floats)"""
+        schema = detect_schema(self.template.columns) or {}
+        return [pl.col(column).cast(pl.Int64, strict=False) for column, spec in schema.items()
+                if spec["type"] == "integer" and column in self.template.columns
+                and pd.api.types.is_float_dtype(self.template[column])]
+
+
+@st.cache_resource(max_entries=2)
+def get_polars_engine(version, sources):
+    """Return the Polars engine shared by all sessions for this dataset version"""
+    return PolarsEngine(list(sources), version)
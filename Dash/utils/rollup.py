@@ -0,0 +1,259 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import appended_base
+from utils.schema import detect_schema
+
+# Dense cubes only: past this many cells (product of the dimension sizes) the
+# least selective dimensions are dropped rather than allocating a huge array
+MAX_CUBE_CELLS = 1_000_000
+
+# Label used for rows where a dimension value is missing
+MISSING = None
+
+# Name of the derived dimension that buckets rows by their period column
+PERIOD = "period"
+
+
+def cube_columns(df):
+    """Return (dimensions, measures, period column) of a frame from its registered schema, or its dtypes"""
+    schema = detect_schema(df.columns) or {}
+    dimensions, measures, period_column = [], [], None
+    for column in df.columns:
+        spec = schema.get(column, {})
+        if spec.get("type") == "category" or spec.get("dimension") \
+                or (not spec and isinstance(df[column].dtype, pd.CategoricalDtype)):
+            dimensions.append(column)
+        if spec.get("type") in ("integer", "float", "currency") \
+                or (not spec and pd.api.types.is_numeric_dtype(df[column])):
+            measures.append(column)
+        if spec.get("period"):
+            period_column = column
+    return dimensions, measures, period_column
+
+
+def period_frequency(dates):
+    """Pick the period length for KPI deltas from the span of the data: days, months or quarters"""
+    span = dates.max() - dates.min()
+    if pd.isna(span) or span <= pd.Timedelta(days=92):
+        return "D"
+    if span <= pd.Timedelta(days=731):
+        return "M"
+    return "Q"
+
+
+class RollupCube:
+    """Row counts and measure sums for every combination of the categorical dimensions
+
+    Each cell holds the number of rows, and per measure the sum and the number
+    of non-missing values, so totals, means and rates for any slice (e.g.
+    loan_status="PAIDOFF", Gender="female") are a few array sums over a small
+    dense array instead of a scan of the dataset. Cells are filled with one
+    np.bincount per array, and appended rows are added the same way.
+    """
+
+    def __init__(self, dimensions, measures, version=None, period=None):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.version = version
+        # (datetime column, pandas frequency) behind the PERIOD dimension, if any
+        self.period = period
+        self.n_rows = 0
+        # Per dimension: labels in code order, and label -> code
+        self.labels = {dim: [] for dim in self.dimensions}
+        self._codes = {dim: {} for dim in self.dimensions}
+        self.counts = np.zeros((0,) * len(self.dimensions), dtype=np.int64)
+        self.sums = {m: np.zeros(self.counts.shape) for m in self.measures}
+        self.valid = {m: np.zeros(self.counts.shape, dtype=np.int64) for m in self.measures}
+
+    @classmethod
+    def from_frame(cls, df, version=None):
+        """Build the cube of a frame over the dimensions and measures of its schema"""
+        dimensions, measures, period_column = cube_columns(df)
+        period = None
+        sizes = {dim: df[dim].nunique(dropna=False) for dim in dimensions}
+        if period_column is not None:
+            period = (period_column, period_frequency(df[period_column]))
+            sizes[PERIOD] = _periods(df, period).nunique(dropna=False)
+            # The period is kept ahead of the other dimensions when trimming below
+            dimensions = [PERIOD] + dimensions
+        # Keep the cube dense: drop the highest-cardinality dimensions that don't fit
+        while len(dimensions) > 1 and np.prod([sizes[dim] for dim in dimensions], dtype=float) > MAX_CUBE_CELLS:
+            dimensions.remove(max(dimensions[1:], key=sizes.get))
+        cube = cls(dimensions, measures, version, period)
+        cube.add(df)
+        return cube
+
+    def copy(self, version=None):
+        """Return an independent copy, e.g. to extend while sessions still read this one"""
+        other = RollupCube(self.dimensions, self.measures, version, self.period)
+        other.n_rows = self.n_rows
+        other.labels = {dim: list(labels) for dim, labels in self.labels.items()}
+        other._codes = {dim: dict(codes) for dim, codes in self._codes.items()}
+        other.counts = self.counts.copy()
+        other.sums = {m: values.copy() for m, values in self.sums.items()}
+        other.valid = {m: values.copy() for m, values in self.valid.items()}
+        return other
+
+    def _dimension_codes(self, dim, series):
+        """Map a column to cube codes, registering labels the cube has not seen yet"""
+        codes, uniques = pd.factorize(series)
+        labels = [str(value) for value in uniques]
+        if (codes < 0).any():
+            labels.append(MISSING)
+        known = self._codes[dim]
+        for label in labels:
+            if label not in known:
+                known[label] = len(self.labels[dim])
+                self.labels[dim].append(label)
+        # factorize marks missing values -1, which picks the last lookup entry
+        lookup = np.array([known[label] for label in labels] or [0], dtype=np.int64)
+        return lookup[codes]
+
+    def _grow(self):
+        """Pad the cell arrays to the current number of labels per dimension"""
+        shape = tuple(len(self.labels[dim]) for dim in self.dimensions)
+        if shape == self.counts.shape:
+            return
+        padding = [(0, new - old) for new, old in zip(shape, self.counts.shape)]
+        self.counts = np.pad(self.counts, padding)
+        self.sums = {m: np.pad(values, padding) for m, values in self.sums.items()}
+        self.valid = {m: np.pad(values, padding) for m, values in self.valid.items()}
+
+    def add(self, df):
+        """Add the rows of a frame to the cube"""
+        if not len(df):
+            return
+        codes = [self._dimension_codes(dim, _periods(df, self.period) if dim == PERIOD else df[dim])
+                 for dim in self.dimensions]
+        self._grow()
+        shape = self.counts.shape
+        cells = int(np.prod(shape))
+        flat = np.ravel_multi_index(codes, shape) if codes else np.zeros(len(df), dtype=np.int64)
+
+        self.counts += np.bincount(flat, minlength=cells).reshape(shape)
+        for m in self.measures:
+            values = df[m].to_numpy(dtype="float64", na_value=np.nan)
+            present = ~np.isnan(values)
+            self.sums[m] += np.bincount(flat[present], weights=values[present], minlength=cells).reshape(shape)
+            self.valid[m] += np.bincount(flat[present], minlength=cells).reshape(shape)
+        self.n_rows += len(df)
+
+    def _slice(self, array, filters):
+        """Restrict an array to the filtered labels, keeping every axis
+
+        Raises KeyError for a filter on a column that isn't a dimension of the
+        cube (e.g. one dropped to keep it dense), so callers can scan instead.
+        """
+        unknown = [column for column in (filters or {}) if column not in self.dimensions]
+        if unknown:
+            raise KeyError(f"Not dimensions of the rollup cube: {', '.join(map(str, unknown))}")
+        for axis, dim in enumerate(self.dimensions):
+            if dim in (filters or {}):
+                ids = [self._codes[dim][label] for label in self._selected(dim, filters[dim])]
+                array = np.take(array, ids, axis=axis)
+        return array
+
+    def _selected(self, dim, selection):
+        """Return the known labels of a filter value (one label or a list of them)"""
+        if not isinstance(selection, (list, tuple, set)):
+            selection = [selection]
+        return [str(label) for label in selection if str(label) in self._codes[dim]]
+
+    def _collapse(self, array, filters, by=()):
+        array = self._slice(array, filters)
+        axes = tuple(axis for axis, dim in enumerate(self.dimensions) if dim not in by)
+        return array.sum(axis=axes)
+
+    def totals(self, filters=None):
+        """Return {"rows": n, "<measure>": sum, "<measure>_count": non-missing} for a slice
+
+        filters maps a dimension to one label or a list of labels; labels are
+        compared by their str() form, as in the data-tab filters. A filter on a
+        column that isn't a dimension raises KeyError (see scan_totals()).
+        """
+        result = {"rows": int(self._collapse(self.counts, filters))}
+        for m in self.measures:
+            result[m] = float(self._collapse(self.sums[m], filters))
+            result[f"{m}_count"] = int(self._collapse(self.valid[m], filters))
+        return result
+
+    def group(self, by, filters=None):
+        """Return a frame of rows, measure sums and non-missing counts per label of one dimension"""
+        columns = {"rows": self._collapse(self.counts, filters, (by,))}
+        for m in self.measures:
+            columns[m] = self._collapse(self.sums[m], filters, (by,))
+            columns[f"{m}_count"] = self._collapse(self.valid[m], filters, (by,))
+        labels = self._selected(by, filters[by]) if filters and by in filters else self.labels[by]
+        return pd.DataFrame(columns, index=pd.Index(labels, name=by))
+
+    def periods(self):
+        """Return the period labels present in the cube, oldest first"""
+        if self.period is None:
+            return []
+        return sorted(label for label in self.labels[PERIOD] if label is not MISSING)
+
+    def rate(self, measure, filters=None):
+        """Share of the rows in a slice where a measure is present (e.g. past-due loans)"""
+        totals = self.totals(filters)
+        return totals[f"{measure}_count"] / totals["rows"] if totals["rows"] else 0.0
+
+
+def _periods(df, period):
+    """Return the period label (e.g. "2016-09-14") of every row, missing dates as NaN"""
+    column, freq = period
+    return df[column].dt.to_period(freq).astype(str).where(df[column].notna())
+
+
+def scan_totals(df, filters, cube):
+    """Answer cube.totals(filters) by scanning the frame, for filters the cube can't slice on"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, selection in (filters or {}).items():
+        if column == PERIOD:
+            if cube.period is None:
+                raise KeyError(column)
+            values = _periods(df, cube.period)
+        else:
+            values = df[column]
+        if not isinstance(selection, (list, tuple, set)):
+            selection = [selection]
+        mask &= (values.notna() & values.astype(str).isin([str(label) for label in selection])).to_numpy()
+
+    result = {"rows": int(mask.sum())}
+    for m in cube.measures:
+        values = df[m].to_numpy(dtype="float64", na_value=np.nan)[mask]
+        present = ~np.isnan(values)
+        result[m] = float(values[present].sum())
+        result[f"{m}_count"] = int(present.sum())
+    return result
+
+
+# The most recent cube, kept so the next version can extend it when rows were appended
+_latest_cube = None
+_cube_lock = threading.Lock()
+
+
+def get_rollup_cube(df, version):
+    """Return the rollup cube of a dataset version, shared by all sessions
+
+    When the version only appended rows to the one before it, the previous
+    cube is copied and the new rows are added to it instead of recounting
+    the whole dataset.
+    """
+    global _latest_cube
+    with _cube_lock:
+        cube = _latest_cube
+        if cube is not None and cube.version == version:
+            return cube
+
+        base_rows = appended_base(version)
+        if cube is not None and cube.version == version - 1 and base_rows == cube.n_rows \
+                and len(df) >= base_rows:
+            cube = cube.copy(version)
+            cube.add(df.iloc[base_rows:])
+        else:
+            cube = RollupCube.from_frame(df, version)
+        _latest_cube = cube
+        return cube
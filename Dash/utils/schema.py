@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Declarative column types for each dataset the dashboard knows about.
+# Supported types:
+#   "category" - low-cardinality labels stored as pandas categoricals
+#   "string"   - free text / identifiers, left as Python strings
+#   "integer"  - whole numbers downcast to the smallest integer dtype
+#   "float"    - numbers (NaN allowed) downcast to float32
+#   "currency" - float64 (cents need the precision), after stripping "$" and ","
+#   "datetime" - datetime64 parsed with a fixed format (no per-row guessing)
+# Category columns are the dimensions of the rollup cube (utils.rollup); other
+# low-cardinality columns can join them with "dimension": True, and the datetime
+# column marked "period": True buckets rows into periods for KPI deltas.
+DATASET_SCHEMAS = {
+    "loan": {
+        "Loan_ID": {"type": "string"},
+        "loan_status": {"type": "category"},
+        "Principal": {"type": "integer"},
+        "terms": {"type": "integer", "dimension": True},
+        "effective_date": {"type": "datetime", "format": "%m/%d/%Y", "period": True},
+        "due_date": {"type": "datetime", "format": "%m/%d/%Y"},
+        "paid_off_time": {"type": "datetime", "format": "%m/%d/%Y %H:%M"},
+        "past_due_days": {"type": "float"},
+        "age": {"type": "integer"},
+        "education": {"type": "category"},
+        "Gender": {"type": "category"},
+    },
+    "sales": {
+        "Segment": {"type": "category"},
+        "Country": {"type": "category"},
+        "Product": {"type": "category"},
+        "Discount Band": {"type": "category"},
+        "Units Sold": {"type": "currency"},
+        "Manufacturing Price": {"type": "currency"},
+        "Sale Price": {"type": "currency"},
+        "Gross Sales": {"type": "currency"},
+        "Discounts": {"type": "currency"},
+        "Sales": {"type": "currency"},
+        "COGS": {"type": "currency"},
+        "Profit": {"type": "currency"},
+        "Date": {"type": "datetime", "format": "%m/%d/%Y", "period": True},
+        "Month Number": {"type": "integer", "dimension": True},
+        "Month Name": {"type": "category"},
+        "Year": {"type": "integer", "dimension": True},
+    },
+}
+
+
+def detect_dataset(columns):
+    """Return the name of the registered schema that best matches the given column names, or None"""
+    columns = set(columns)
+    best_name, best_overlap = None, 0
+    for name, schema in DATASET_SCHEMAS.items():
+        overlap = len(columns & set(schema))
+        if overlap > best_overlap:
+            best_name, best_overlap = name, overlap
+    return best_name
+
+
+def detect_schema(columns):
+    """Return the registered schema that best matches the given column names, or None"""
+    name = detect_dataset(columns)
+    return DATASET_SCHEMAS[name] if name else None
+
+
+def csv_read_options(schema):
+    """Return read_csv keyword arguments that parse text columns straight into their final dtype"""
+    if not schema:
+        return {}
+    dtype = {}
+    for column, spec in schema.items():
+        if spec["type"] == "category":
+            dtype[column] = "category"
+        elif spec["type"] in ("string", "currency", "datetime"):
+            # Keep these as text so the converters below see the raw values
+            dtype[column] = "object"
+    return {"dtype": dtype}
+
+
+def _to_integer(series):
+    values = pd.to_numeric(series, errors="coerce")
+    if values.isna().any():
+        # Integers with gaps cannot use a numpy integer dtype; keep them compact as floats
+        return values.astype(np.float32)
+    return pd.to_numeric(values, downcast="integer")
+
+
+def _to_float(series):
+    return pd.to_numeric(series, errors="coerce").astype(np.float32)
+
+
+def _to_currency(series):
+    if series.dtype == "object":
+        series = series.str.replace(r"[$,]", "", regex=True)
+    return pd.to_numeric(series, errors="coerce").astype(np.float64)
+
+
+def _to_string(series):
+    # pandas 3 reads text back from Parquet as the str dtype; keep Python strings like a fresh parse
+    if series.dtype == "object":
+        return series
+    return series.astype(object)
+
+
+def _to_datetime(series, fmt):
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, format=fmt, errors="coerce")
+    # One resolution whichever way the column was read (pandas 3 parses to microseconds)
+    return series.astype("datetime64[ns]")
+
+
+def _to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    return series.astype("category")
+
+
+def apply_schema(df, schema=None):
+    """Convert the columns of df to the compact dtypes declared by its schema"""
+    if schema is None:
+        schema = detect_schema(df.columns)
+    if not schema:
+        return df
+
+    for column, spec in schema.items():
+        if column not in df.columns:
+            continue
+        kind = spec["type"]
+        if kind == "category":
+            df[column] = _to_category(df[column])
+        elif kind == "integer":
+            df[column] = _to_integer(df[column])
+        elif kind == "float":
+            df[column] = _to_float(df[column])
+        elif kind == "currency":
+            df[column] = _to_currency(df[column])
+        elif kind == "datetime":
+            df[column] = _to_datetime(df[column], spec.get("format"))
+        elif kind == "string":
+            df[column] = _to_string(df[column])
+    return df
+
+
+def concat_frames(frames):
+    """Concatenate typed frames, merging categoricals instead of falling back to object"""
+    frames = [frame for frame in frames if len(frame.columns)]
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            # Each frame may have seen a different set of labels; give them all the union
+            categories = union_categoricals(
+                [frame[column].astype("category") for frame in frames if column in frame.columns]).categories
+            for frame in frames:
+                if column in frame.columns:
+                    frame[column] = frame[column].astype(pd.CategoricalDtype(categories))
+    return pd.concat(frames, ignore_index=True)
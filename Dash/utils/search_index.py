@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Columns with more distinct values than this are not trigram-indexed (the
+# postings would cost more than they save); their distinct strings are scanned
+# with one vectorized substring match instead, as are terms under 3 characters
+MAX_INDEXED_VALUES = 200_000
+
+# Scans run on Arrow strings when pyarrow is installed: its substring kernel is
+# several times faster than str.contains over Python strings
+try:
+    import pyarrow  # noqa: F401
+    SCAN_DTYPE = "string[pyarrow]"
+except ImportError:
+    SCAN_DTYPE = object
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ColumnSearchIndex:
+    """Case-insensitive substring search over the string forms of one column
+
+    Every cell is mapped to the id of its distinct string, and a trigram
+    inverted index over those distinct strings yields candidate ids. Only the
+    candidates are confirmed with a real substring test, and the matching ids
+    are expanded back to rows with a single lookup.
+    """
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            self.codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories.astype(str)
+        else:
+            self.codes, uniques = pd.factorize(series.astype(str))
+        self.values = [value.lower() for value in uniques]
+        self._series = None
+        self.postings = self._build_postings() if len(self.values) <= MAX_INDEXED_VALUES else None
+
+    def _build_postings(self):
+        postings = {}
+        for value_id, value in enumerate(self.values):
+            for gram in _trigrams(value):
+                postings.setdefault(gram, []).append(value_id)
+        return {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def _scan(self, term):
+        """Vectorized substring match over every distinct string"""
+        if self._series is None:
+            self._series = pd.Series(self.values, dtype=SCAN_DTYPE)
+        hits = self._series.str.contains(term, regex=False)
+        return np.flatnonzero(hits.to_numpy(dtype=bool, na_value=False))
+
+    def matching_values(self, term):
+        """Return the ids of the distinct strings containing the (lower-case) term"""
+        # Terms shorter than a trigram can't use the postings
+        if self.postings is None or len(term) < 3:
+            return self._scan(term)
+
+        # Intersect the posting lists, shortest first, then confirm the survivors
+        lists = sorted((self.postings.get(gram) for gram in _trigrams(term)),
+                       key=lambda ids: -1 if ids is None else len(ids))
+        if lists[0] is None:
+            return np.array([], dtype=np.int32)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                break
+        return np.array([i for i in candidates if term in self.values[i]], dtype=np.int32)
+
+    def row_mask(self, term):
+        """Return a boolean mask of the rows whose cell contains the term"""
+        # One extra slot so missing categorical codes (-1) land on False
+        hit = np.zeros(len(self.values) + 1, dtype=bool)
+        hit[self.matching_values(term)] = True
+        return hit[self.codes]
+
+
+class SearchIndex:
+    """Lazily built per-column search indexes over one dataset version"""
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = ColumnSearchIndex(self.df[name])
+        return self._columns[name]
+
+    def match_mask(self, term, columns=None):
+        """Return a boolean mask of rows where any of the columns contains term, ignoring case"""
+        term = term.lower()
+        mask = np.zeros(len(self.df), dtype=bool)
+        for name in columns or self.df.columns:
+            mask |= self.column(name).row_mask(term)
+        return mask
+
+
+@st.cache_resource(max_entries=2)
+def _index_for_version(version, _df):
+    return SearchIndex(_df)
+
+
+def get_search_index(df, version):
+    """Return the search index shared by all sessions for this dataset version"""
+    return _index_for_version(version, df)
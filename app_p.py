@@ -675,15 +675,26 @@ with tab3:
         st.markdown("</div>", unsafe_allow_html=True)
 
 
-# Allow users to upload their own CSV file
+def data_version():
+    """Identify the current contents of data.csv by its size and modification time"""
+    try:
+        stat = os.stat("data.csv")
+        return (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return None
+
 def convert_to_pai_dataframe(pandas_df):
-    # Method 1: Save to temporary CSV and reload with PandasAI
-    temp_file = "data.csv"
-    pandas_df.to_csv(temp_file, index=False)
-    pai_df = pai.read_csv(temp_file)
-    # Clean up temp file (optional)
-    # import os
-    # os.remove(temp_file)
+    """Wrap the cleaned pandas frame as a PandasAI DataFrame, once per version of data.csv"""
+    # Wrapping in memory avoids serializing to disk and re-parsing on every question,
+    # and never overwrites the source data.csv. The wrapper is kept per session so
+    # concurrent users don't share one agent.
+    version = data_version()
+    cached = st.session_state.get('pai_dataframe')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    pai_df = pai.DataFrame(pandas_df)
+    st.session_state.pai_dataframe = (version, pai_df)
     return pai_df
 
 # Add this to the sidebar section of your dashboard
@@ -692,7 +703,8 @@ with st.sidebar:
 
     # Add a refresh button
     if st.button("Refresh Data"):
-        st.cache_data.clear()
+        # Only drop the dataset's cache entries, not every cached function in the app
+        load_data.clear()
         st.success("Data cache cleared. Dashboard will refresh with latest data.")
         st.experimental_rerun()
 